@@ -1,19 +1,31 @@
 # app/controllers.py
 
 import os
-import threading
-import time
+from collections import deque
 from pathlib import Path
-from datetime import datetime
+from typing import Optional
 import numpy as np
+from PyQt5.QtCore import Qt, QThreadPool, QTimer
+from PyQt5.QtGui import QTextCursor
 
-from core.constants import ChannelKind, DEFAULT_VIS_SERIAL, DEFAULT_NIR_SERIAL, TIME_FORMAT_ISO, FULL_SCALE_COUNTS
+from core.constants import ChannelKind, DEFAULT_VIS_SERIAL, DEFAULT_NIR_SERIAL, FULL_SCALE_COUNTS
 from core.models import SessionState, ChannelState, Spectrum
-from core.analysis import saturation_percent, compute_reflectance
+from core.devices import avaspec  # None when the driver is unavailable
+from core.analysis import compute_reflectance
 from core.repository import save_spectrum_csv, load_spectrum_csv, save_repeats_csv
-from app.threads import ContinuousAcquisitionThread, RepeatedAcquisitionThread
+from core.timestamps import iso_now
+from app.threads import (
+    ContinuousAcquisitionThread, RepeatedAcquisitionThread,
+    SingleMeasurementSignals, SingleMeasurementTask
+)
+
+# Wavelength-range text shown next to calibration/sample indicators
+RANGE_META_FMT = "{lo:.2f}–{hi:.2f} nm"
 
 class Controller:
+    # Raw-plot point budget per channel while continuous acquisition is streaming
+    LIVE_PLOT_MAX_POINTS = 1024
+
     def __init__(self, state: SessionState, devices, ui, parent_qobj):
         """
         devices: dict {ChannelKind: Spectrometer}
@@ -25,17 +37,41 @@ class Controller:
         self.ui = ui
         self.parent = parent_qobj
 
-        # Threads
+        # Threads (worker signals are always queued so workers never wait on the GUI)
         self.cont_thread = ContinuousAcquisitionThread(devices[ChannelKind.VIS], devices[ChannelKind.NIR], parent_qobj)
-        self.cont_thread.new_spectrum.connect(self._on_continuous_spectrum)
+        self.cont_thread.new_tick.connect(self._on_continuous_tick, Qt.QueuedConnection)
 
         self.repeat_thread = None
 
-        # Throttling
-        self._last_cont_plot = 0.0
+        # Single measurements run on QThreadPool; one shared signal emitter
+        self._single_signals = SingleMeasurementSignals()
+        self._single_signals.result.connect(self._on_single_ready, Qt.QueuedConnection)
+        self._single_signals.error.connect(self._on_single_error, Qt.QueuedConnection)
+        self._single_pending = set()
+
+        # Throttling: continuous-mode redraws are coalesced via single-shot timers
+        self._plot_dirty = False
+        self._plot_dirty_kinds = set()
         self._cont_interval_s = 0.01
-        self._last_refl_plot = 0.0
+        self._refl_dirty = False
         self._refl_interval_s = 0.05
+        self._cont_live = False
+        # (sample, reference, dark) objects behind each channel's cached reflectance;
+        # compared by identity, holding the references so ids can't be recycled
+        self._refl_inputs = {ChannelKind.VIS: None, ChannelKind.NIR: None}
+        # last (lam_min, lam_max) shown for the sample entry during a continuous run
+        self._cont_vis_bounds = None
+        self._cont_nir_bounds = None
+        # (lam, max_points, bin indices, decimated x) per channel; the x array is
+        # reused so the plot widget's identity caches hit on the live path
+        self._decim_grids = {ChannelKind.VIS: None, ChannelKind.NIR: None}
+
+        # Log lines are queued and flushed to the widget in one insert, at most every 150 ms
+        self._log_q = deque()
+        self._log_timer = QTimer(parent_qobj)
+        self._log_timer.setSingleShot(True)
+        self._log_timer.setInterval(150)
+        self._log_timer.timeout.connect(self._flush_log)
 
         self._wire_calibration_buttons()
 
@@ -49,15 +85,29 @@ class Controller:
 
     def log(self, text: str):
         self.state.append_log(text)
-        self.ui.resp_panel.log_txt.append(text)
+        self._log_q.append(text)
+        if not self._log_timer.isActive():
+            self._log_timer.start()
+
+    def log_many(self, texts):
+        """Log several lines; they reach the widget in the same flush."""
+        for text in texts:
+            self.log(text)
+
+    def _flush_log(self):
+        if not self._log_q:
+            return
+        w = self.ui.resp_panel.log_txt
+        text = "\n".join(self._log_q)
+        self._log_q.clear()
+        w.appendPlainText(text)
+        w.moveCursor(QTextCursor.End)
 
     # ---------------- Connections ----------------
 
     def setup_connections(self):
         self.log("[INFO] Searching for Avantes spectrometers …")
-        try:
-            import avaspec
-        except ImportError:
+        if avaspec is None:
             self.log("[ERROR] avaspec library not found.")
             return
 
@@ -88,7 +138,7 @@ class Controller:
                 st.connected = True
                 st.serial = serial
                 st.num_pixels = d.num_pixels
-                st.wavelength_nm_full = d.wavelengths.copy()
+                st.wavelength_nm_full = d.wavelengths  # shared read-only grid
                 # clamp UI range
                 self.ui.set_panel.vis_set.stop_pix.setRange(0, d.num_pixels - 1)
                 self.ui.set_panel.vis_set.stop_pix.setValue(d.num_pixels - 1)
@@ -105,9 +155,10 @@ class Controller:
                 st.connected = True
                 st.serial = serial
                 st.num_pixels = d.num_pixels
-                st.wavelength_nm_full = d.wavelengths.copy()
-                self.ui.set_panel.nir_set.stop_pix.setRange(0, d.num_pixels - 1)
-                self.ui.set_panel.nir_set.stop_pix.setValue(d.num_pixels - 1)
+                st.wavelength_nm_full = d.wavelengths  # shared read-only grid
+                nir_set = self.ui.set_panel.nir_panel()
+                nir_set.stop_pix.setRange(0, d.num_pixels - 1)
+                nir_set.stop_pix.setValue(d.num_pixels - 1)
                 self.ui.meas_panel.chk_nir.setChecked(True)
                 self.log("[INFO] Connected NIR ({})".format(serial))
                 found_nir = True
@@ -118,9 +169,7 @@ class Controller:
             self.log("[WARNING] NIR spectrometer not found.")
 
     def disconnect_spectrometers(self, silent: bool = False):
-        try:
-            import avaspec
-        except ImportError:
+        if avaspec is None:
             return
 
         for kind in (ChannelKind.VIS, ChannelKind.NIR):
@@ -147,202 +196,214 @@ class Controller:
 
     # ---------------- Single measurement ----------------
 
+    def _single_busy(self) -> bool:
+        """True (and logged) while pooled single measurements still own the devices."""
+        if self._single_pending:
+            self.log("[WARNING] Single measurement in progress; wait for it to finish.")
+            return True
+        return False
+
+    def _acquisition_busy(self) -> bool:
+        """True (and logged) while the continuous or repeated thread is driving the devices."""
+        rep = self.repeat_thread
+        if self.cont_thread.isRunning() or (rep is not None and rep.isRunning()):
+            self.log("[WARNING] Acquisition running; stop it first.")
+            return True
+        return False
+
     def measure_single(self):
         if not self.state.vis.connected and not self.state.nir.connected:
             self.log("[ERROR] No spectrometer connected.")
             return
+        if self._single_busy() or self._acquisition_busy():
+            return
 
         vis_set = self.ui.set_panel.get_vis()
         nir_set = self.ui.set_panel.get_nir()
 
-        results = {}
-        errors = {}
-
-        def do_vis():
-            try:
-                if self.state.vis.connected:
-                    lam, spec = self.devices[ChannelKind.VIS].single_measurement(
-                        start_pixel=vis_set.start_pixel,
-                        stop_pixel=vis_set.stop_pixel,
-                        exposure_ms=vis_set.exposure_ms,
-                        n_averages=vis_set.n_averages,
-                        trigger_mode=vis_set.trigger_mode
-                    )
-                    sp = Spectrum(
-                        wavelength_nm=lam, counts=spec,
-                        ts_iso=datetime.now().strftime(TIME_FORMAT_ISO),
-                        settings_snapshot=vis_set,
-                        serial=self.devices[ChannelKind.VIS].serial,
-                        role="sample"
-                    )
-                    results[ChannelKind.VIS] = sp
-            except Exception as e:
-                errors[ChannelKind.VIS] = e
-
-        def do_nir():
-            try:
-                if self.state.nir.connected:
-                    lam, spec = self.devices[ChannelKind.NIR].single_measurement(
-                        start_pixel=nir_set.start_pixel,
-                        stop_pixel=nir_set.stop_pixel,
-                        exposure_ms=nir_set.exposure_ms,
-                        n_averages=nir_set.n_averages,
-                        trigger_mode=nir_set.trigger_mode
-                    )
-                    sp = Spectrum(
-                        wavelength_nm=lam, counts=spec,
-                        ts_iso=datetime.now().strftime(TIME_FORMAT_ISO),
-                        settings_snapshot=nir_set,
-                        serial=self.devices[ChannelKind.NIR].serial,
-                        role="sample"
-                    )
-                    results[ChannelKind.NIR] = sp
-            except Exception as e:
-                errors[ChannelKind.NIR] = e
-
-        threads = []
-        if self.state.vis.connected:
-            t = threading.Thread(target=do_vis); t.start(); threads.append(t)
-        if self.state.nir.connected:
-            t = threading.Thread(target=do_nir); t.start(); threads.append(t)
-        for t in threads:
-            t.join()
+        # Fan out to the Qt pool; results arrive on the GUI thread via signals
+        pool = QThreadPool.globalInstance()
+        for kind, ch, settings in ((ChannelKind.VIS, self.state.vis, vis_set),
+                                   (ChannelKind.NIR, self.state.nir, nir_set)):
+            if ch.connected:
+                self._single_pending.add(kind)
+                pool.start(SingleMeasurementTask(kind, self.devices[kind], settings, self._single_signals))
 
+    def _on_single_ready(self, kind: ChannelKind, sp: Spectrum):
         # Update state & UI
-        if ChannelKind.VIS in results:
-            sp = results[ChannelKind.VIS]
-            ch = self.state.vis
-            ch.latest_sample = sp
-            ch.calib.sample = sp
-            vs = saturation_percent(sp.counts)
-            self.log(f"[INFO] VIS sample measured – {sp.counts.size} pts (sat {vs:.1f}%).")
-            entry = self.ui.meas_panel.calib_entries["sample"]
-            entry.vis_ind.set_green()
-            entry.vis_meta.setText(f"{sp.wavelength_nm.min():.2f}–{sp.wavelength_nm.max():.2f} nm")
-        elif ChannelKind.VIS in errors:
-            self.log(f"[ERROR] VIS sample measurement failed: {errors[ChannelKind.VIS]}")
-
-        if ChannelKind.NIR in results:
-            sp = results[ChannelKind.NIR]
-            ch = self.state.nir
-            ch.latest_sample = sp
-            ch.calib.sample = sp
-            ns = saturation_percent(sp.counts)
-            self.log(f"[INFO] NIR sample measured – {sp.counts.size} pts (sat {ns:.1f}%).")
-            entry = self.ui.meas_panel.calib_entries["sample"]
-            entry.nir_ind.set_green()
-            entry.nir_meta.setText(f"{sp.wavelength_nm.min():.2f}–{sp.wavelength_nm.max():.2f} nm")
-        elif ChannelKind.NIR in errors:
-            self.log(f"[ERROR] NIR sample measurement failed: {errors[ChannelKind.NIR]}")
+        ch = self.state.vis if kind is ChannelKind.VIS else self.state.nir
+        ch.latest_sample = sp
+        ch.calib.sample = sp
+        sat = sp.sat_pct
+        self.log(f"[INFO] {kind.value} sample measured – {sp.counts.size} pts (sat {sat:.1f}%).")
+        entry = self.ui.meas_panel.calib_entries["sample"]
+        ind, meta = (entry.vis_ind, entry.vis_meta) if kind is ChannelKind.VIS else (entry.nir_ind, entry.nir_meta)
+        ind.set_green()
+        meta.setText(RANGE_META_FMT.format(lo=sp.lam_min, hi=sp.lam_max))
+        self._single_done(kind)
+
+    def _on_single_error(self, kind: ChannelKind, msg: str):
+        self.log(f"[ERROR] {kind.value} sample measurement failed: {msg}")
+        self._single_done(kind)
+
+    def _single_done(self, kind: ChannelKind):
+        self._single_pending.discard(kind)
+        if self._single_pending:
+            return
 
         # Raw plot
-        lam_v, spec_v = (self.state.vis.latest_sample.wavelength_nm, self.state.vis.latest_sample.counts) if self.state.vis.latest_sample else (None, None)
-        lam_n, spec_n = (self.state.nir.latest_sample.wavelength_nm, self.state.nir.latest_sample.counts) if self.state.nir.latest_sample else (None, None)
-        vs = saturation_percent(spec_v) if spec_v is not None else None
-        ns = saturation_percent(spec_n) if spec_n is not None else None
-        self.ui.resp_panel.spectrum_widget.plot_two(lam_vis=lam_v, spec_vis=spec_v, vis_sat=vs,
-                                                    lam_nir=lam_n, spec_nir=spec_n, nir_sat=ns)
+        self._plot_latest()
 
         # Reflectance
         self.update_reflectance_plot()
 
+    def _decimation_grid(self, kind: ChannelKind, lam: np.ndarray, max_points: int):
+        """(bin start indices, decimated x) for `lam`, reused while the same grid keeps coming in."""
+        cached = self._decim_grids[kind]
+        if cached is not None and cached[0] is lam and cached[1] == max_points:
+            return cached[2], cached[3]
+        step = -(-2 * lam.size // max_points)
+        idx = np.arange(0, lam.size, step)
+        x = np.repeat(lam[idx], 2)
+        x[-1] = lam[-1]  # keep the full wavelength extent
+        x.setflags(write=False)
+        self._decim_grids[kind] = (lam, max_points, idx, x)
+        return idx, x
+
+    def _plot_arrays(self, kind: ChannelKind, sp: Optional[Spectrum], max_points: Optional[int]):
+        if sp is None:
+            return None, None
+        lam, y = sp.wavelength_nm, sp.counts
+        if max_points and y.size > max_points:
+            # peak decimation: (min, max) per bin of `step` pixels, so narrow peaks survive
+            idx, lam = self._decimation_grid(kind, lam, max_points)
+            peaks = np.empty(2 * idx.size, dtype=y.dtype)
+            peaks[0::2] = np.minimum.reduceat(y, idx)
+            peaks[1::2] = np.maximum.reduceat(y, idx)
+            y = peaks
+        return lam, y
+
+    def _plot_raw(self, vis: Optional[Spectrum], nir: Optional[Spectrum], max_points: Optional[int] = None):
+        # saturation comes precomputed on each (full-resolution) Spectrum
+        lam_v, spec_v = self._plot_arrays(ChannelKind.VIS, vis, max_points)
+        lam_n, spec_n = self._plot_arrays(ChannelKind.NIR, nir, max_points)
+        self.ui.resp_panel.spectrum_widget.plot_two(
+            lam_vis=lam_v, spec_vis=spec_v, vis_label=vis.sat_label if vis else None,
+            lam_nir=lam_n, spec_nir=spec_n, nir_label=nir.sat_label if nir else None)
+
+    def _plot_latest(self, max_points: Optional[int] = None):
+        self._plot_raw(self.state.vis.latest_sample, self.state.nir.latest_sample, max_points)
+
     # ---------------- Continuous ----------------
 
     def start_continuous(self):
+        if self._single_busy():
+            return
         vis_set = self.ui.set_panel.get_vis()
         nir_set = self.ui.set_panel.get_nir()
+        self._cont_vis_bounds = self._cont_nir_bounds = None
+        self._cont_live = True
         self.cont_thread.start_acquisition(vis_set, nir_set)
 
     def stop_continuous(self):
         self.cont_thread.stop_acquisition()
+        self._cont_vis_bounds = self._cont_nir_bounds = None
+        # redraw the last spectra at full resolution
+        self._cont_live = False
+        self._plot_latest()
 
-    def _on_continuous_spectrum(self, kind: ChannelKind, spectrum: Spectrum):
-        # Stash
-        ch = self.state.vis if kind is ChannelKind.VIS else self.state.nir
-        ch.latest_sample = spectrum
-        ch.calib.sample = spectrum
-
-        # Update sample indicators
+    def _on_continuous_tick(self, vis_sp: Optional[Spectrum], nir_sp: Optional[Spectrum]):
         entry = self.ui.meas_panel.calib_entries["sample"]
-        if kind is ChannelKind.VIS:
-            entry.vis_ind.set_green()
-            entry.vis_meta.setText(f"{spectrum.wavelength_nm.min():.2f}–{spectrum.wavelength_nm.max():.2f} nm")
-        else:
-            entry.nir_ind.set_green()
-            entry.nir_meta.setText(f"{spectrum.wavelength_nm.min():.2f}–{spectrum.wavelength_nm.max():.2f} nm")
-
-        now = time.time()
-        # Raw plot (throttled)
-        if now - self._last_cont_plot >= self._cont_interval_s:
-            self._last_cont_plot = now
-            lam_v, spec_v = (self.state.vis.latest_sample.wavelength_nm, self.state.vis.latest_sample.counts) if self.state.vis.latest_sample else (None, None)
-            lam_n, spec_n = (self.state.nir.latest_sample.wavelength_nm, self.state.nir.latest_sample.counts) if self.state.nir.latest_sample else (None, None)
-            vs = saturation_percent(spec_v) if spec_v is not None else None
-            ns = saturation_percent(spec_n) if spec_n is not None else None
-            self.ui.resp_panel.spectrum_widget.plot_two(lam_vis=lam_v, spec_vis=spec_v, vis_sat=vs,
-                                                        lam_nir=lam_n, spec_nir=spec_n, nir_sat=ns)
-
-        # Reflectance (throttled)
-        if now - self._last_refl_plot >= self._refl_interval_s:
-            self._last_refl_plot = now
-            self.update_reflectance_plot()
+        if vis_sp is not None:
+            # Stash
+            self.state.vis.latest_sample = vis_sp
+            self.state.vis.calib.sample = vis_sp
+            # Update sample indicators only when the range changes (once per run)
+            bounds = (vis_sp.lam_min, vis_sp.lam_max)
+            if bounds != self._cont_vis_bounds:
+                self._cont_vis_bounds = bounds
+                entry.vis_ind.set_green()
+                entry.vis_meta.setText(RANGE_META_FMT.format(lo=vis_sp.lam_min, hi=vis_sp.lam_max))
+        if nir_sp is not None:
+            self.state.nir.latest_sample = nir_sp
+            self.state.nir.calib.sample = nir_sp
+            bounds = (nir_sp.lam_min, nir_sp.lam_max)
+            if bounds != self._cont_nir_bounds:
+                self._cont_nir_bounds = bounds
+                entry.nir_ind.set_green()
+                entry.nir_meta.setText(RANGE_META_FMT.format(lo=nir_sp.lam_min, hi=nir_sp.lam_max))
+
+        # Coalesce redraws: mark dirty and schedule at most one flush per interval
+        if vis_sp is not None:
+            self._plot_dirty_kinds.add(ChannelKind.VIS)
+        if nir_sp is not None:
+            self._plot_dirty_kinds.add(ChannelKind.NIR)
+        if not self._plot_dirty:
+            self._plot_dirty = True
+            QTimer.singleShot(int(self._cont_interval_s * 1000), self._flush_cont_plot)
+        if not self._refl_dirty:
+            self._refl_dirty = True
+            QTimer.singleShot(int(self._refl_interval_s * 1000), self._flush_refl_plot)
+
+    def _flush_cont_plot(self):
+        self._plot_dirty = False
+        # decimated while streaming; full resolution once stopped
+        max_points = self.LIVE_PLOT_MAX_POINTS if self._cont_live else None
+        # only the channels that received data since the last flush are redrawn
+        widget = self.ui.resp_panel.spectrum_widget
+        for kind in self._plot_dirty_kinds:
+            sp = self.state.vis.latest_sample if kind is ChannelKind.VIS else self.state.nir.latest_sample
+            lam, y = self._plot_arrays(kind, sp, max_points)
+            # clamp the wavelength controls to the full-resolution bounds, not the decimated grid
+            widget.update_curve(kind, lam, y, sp.sat_label if sp else None,
+                                (sp.lam_min, sp.lam_max) if sp else None)
+        self._plot_dirty_kinds.clear()
+
+    def _flush_refl_plot(self):
+        self._refl_dirty = False
+        self.update_reflectance_plot()
 
     # ---------------- Repeated ----------------
 
     def start_repeated(self):
+        if self._single_busy():
+            return
         cnt = self.ui.meas_panel.repeat_count.value()
         interval = self.ui.meas_panel.repeat_interval.value()
         vis_set = self.ui.set_panel.get_vis()
         nir_set = self.ui.set_panel.get_nir()
 
         # Clear previous
-        self.state.vis.repeats_buffer.clear()
-        self.state.nir.repeats_buffer.clear()
+        self.state.vis.reset_repeats(cnt)
+        self.state.nir.reset_repeats(cnt)
 
         self.repeat_thread = RepeatedAcquisitionThread(
             self.devices[ChannelKind.VIS], self.devices[ChannelKind.NIR],
             vis_set, nir_set, cnt, interval, self.parent
         )
-        self.repeat_thread.new_repeat.connect(self._on_repeated_spectrum)
-        self.repeat_thread.finished.connect(self._save_repeated_results)
+        self.repeat_thread.new_repeat.connect(self._on_repeated_spectrum, Qt.QueuedConnection)
+        self.repeat_thread.finished.connect(self._save_repeated_results, Qt.QueuedConnection)
         self.repeat_thread.start()
 
     def _on_repeated_spectrum(self, kind: ChannelKind, spectrum: Spectrum, idx: int):
         ch = self.state.vis if kind is ChannelKind.VIS else self.state.nir
-        ch.repeats_buffer.append(spectrum)
-
-        # Live plot the last spectrum for that channel
-        lam_v, spec_v = (self.state.vis.latest_sample.wavelength_nm, self.state.vis.latest_sample.counts) if self.state.vis.latest_sample else (None, None)
-        lam_n, spec_n = (self.state.nir.latest_sample.wavelength_nm, self.state.nir.latest_sample.counts) if self.state.nir.latest_sample else (None, None)
-
-        # Update current latest with incoming
-        if kind is ChannelKind.VIS:
-            lam_v, spec_v = spectrum.wavelength_nm, spectrum.counts
-        else:
-            lam_n, spec_n = spectrum.wavelength_nm, spectrum.counts
+        if ch.repeats_matrix is not None:
+            ch.repeats_matrix[:, idx] = spectrum.counts
+            ch.repeats_filled += 1
 
-        vs = saturation_percent(spec_v) if spec_v is not None else None
-        ns = saturation_percent(spec_n) if spec_n is not None else None
-        self.ui.resp_panel.spectrum_widget.plot_two(lam_vis=lam_v, spec_vis=spec_v, vis_sat=vs,
-                                                    lam_nir=lam_n, spec_nir=spec_n, nir_sat=ns)
+        # Live plot: swap only this channel's curve
+        self.ui.resp_panel.spectrum_widget.update_curve(kind, spectrum.wavelength_nm, spectrum.counts, spectrum.sat_label)
 
     def _save_repeated_results(self):
         folder = Path(self.ui.meas_panel.save_dir_path or self.state.save_dir)
         name = self.ui.meas_panel.repeat_name.text().strip() or None
 
-        # VIS
-        if self.state.vis.repeats_buffer:
-            lam = self.state.vis.repeats_buffer[0].wavelength_nm
-            counts = np.column_stack([sp.counts for sp in self.state.vis.repeats_buffer])
-            path = save_repeats_csv(ChannelKind.VIS, lam, counts, folder, name)
-            self.log(f"[INFO] Saved VIS repeats → {path}")
-
-        # NIR
-        if self.state.nir.repeats_buffer:
-            lam = self.state.nir.repeats_buffer[0].wavelength_nm
-            counts = np.column_stack([sp.counts for sp in self.state.nir.repeats_buffer])
-            path = save_repeats_csv(ChannelKind.NIR, lam, counts, folder, name)
-            self.log(f"[INFO] Saved NIR repeats → {path}")
+        for ch in self.state.channels():
+            n = ch.repeats_filled
+            if ch.repeats_matrix is None or n == 0:
+                continue
+            path = save_repeats_csv(ch.kind, ch.wavelength_nm_full, ch.repeats_matrix[:, :n], folder, name)
+            self.log(f"[INFO] Saved {ch.kind.value} repeats → {path}")
 
     # ---------------- Calibration (load/measure) ----------------
 
@@ -361,7 +422,7 @@ class Controller:
         if chan is ChannelKind.VIS:
             entry = self.ui.meas_panel.calib_entries[key]
             entry.vis_ind.set_green()
-            entry.vis_meta.setText(f"{sp.wavelength_nm.min():.2f}–{sp.wavelength_nm.max():.2f} nm")
+            entry.vis_meta.setText(RANGE_META_FMT.format(lo=sp.lam_min, hi=sp.lam_max))
             if key == "reference": self.state.vis.calib.reference = sp
             elif key == "dark":    self.state.vis.calib.dark = sp
             elif key == "abs":     self.state.vis.calib.abs_cal = sp
@@ -369,88 +430,108 @@ class Controller:
         else:
             entry = self.ui.meas_panel.calib_entries[key]
             entry.nir_ind.set_green()
-            entry.nir_meta.setText(f"{sp.wavelength_nm.min():.2f}–{sp.wavelength_nm.max():.2f} nm")
+            entry.nir_meta.setText(RANGE_META_FMT.format(lo=sp.lam_min, hi=sp.lam_max))
             if key == "reference": self.state.nir.calib.reference = sp
             elif key == "dark":    self.state.nir.calib.dark = sp
             elif key == "abs":     self.state.nir.calib.abs_cal = sp
             elif key == "sample":  self.state.nir.calib.sample = sp
 
+        if key == "sample":
+            self._cont_vis_bounds = self._cont_nir_bounds = None
         self.log(f"[INFO] Loaded {chan.value} {key} → {path}")
         self.update_reflectance_plot()
 
     def measure_calibration(self, key: str):
+        if self._single_busy() or self._acquisition_busy():
+            return
         role = key  # "reference" | "dark" | "abs" | "sample"
-        for kind in (ChannelKind.VIS, ChannelKind.NIR):
-            d = self.devices[kind]
-            ch = self.state.vis if kind is ChannelKind.VIS else self.state.nir
-            if not ch.connected:
-                self.log(f"[ERROR] {kind.value} not connected.")
-                continue
-
-            settings = self.ui.set_panel.get_vis() if kind is ChannelKind.VIS else self.ui.set_panel.get_nir()
-            try:
-                lam, spec = d.single_measurement(
-                    start_pixel=settings.start_pixel,
-                    stop_pixel=settings.stop_pixel,
-                    exposure_ms=settings.exposure_ms,
-                    n_averages=settings.n_averages,
-                    trigger_mode=settings.trigger_mode
-                )
-                sp = Spectrum(
-                    wavelength_nm=lam, counts=spec,
-                    ts_iso=datetime.now().strftime(TIME_FORMAT_ISO),
-                    settings_snapshot=settings,
-                    serial=d.serial, role=role if role != "abs" else "abs"
-                )
-                # Store to calib slot
-                if role == "reference": ch.calib.reference = sp
-                elif role == "dark": ch.calib.dark = sp
-                elif role == "abs": ch.calib.abs_cal = sp
-                elif role == "sample": ch.calib.sample = sp
-
-                # UI indicator
-                entry = self.ui.meas_panel.calib_entries[key]
-                meta = f"{len(lam)} px, {settings.exposure_ms:.2f} ms, {sp.ts_iso}"
-                if kind is ChannelKind.VIS:
-                    entry.vis_ind.set_green(); entry.vis_meta.setText(meta)
-                else:
-                    entry.nir_ind.set_green(); entry.nir_meta.setText(meta)
-
-                # Save to CSV
-                folder = Path(self.ui.meas_panel.save_dir_path or self.state.save_dir)
-                out = save_spectrum_csv(kind, sp, folder)
-                self.log(f"[INFO] Saved {kind.value} {role} → {out}")
-
-            except Exception as e:
-                entry = self.ui.meas_panel.calib_entries[key]
-                if kind is ChannelKind.VIS: entry.vis_ind.set_red()
-                else: entry.nir_ind.set_red()
-                self.log(f"[ERROR] {kind.value} {role} measurement failed: {e}")
+        if key == "sample":
+            # the sample entry is rewritten below; let continuous ticks repaint it afterwards
+            self._cont_vis_bounds = self._cont_nir_bounds = None
+        # Batch repaints of the entry row and log lines into one pass after both channels
+        entry_widget = self.ui.meas_panel.calib_entries[key]
+        entry_widget.setUpdatesEnabled(False)
+        msgs = []
+        try:
+            for kind in (ChannelKind.VIS, ChannelKind.NIR):
+                d = self.devices[kind]
+                ch = self.state.vis if kind is ChannelKind.VIS else self.state.nir
+                if not ch.connected:
+                    msgs.append(f"[ERROR] {kind.value} not connected.")
+                    continue
+
+                settings = self.ui.set_panel.get_vis() if kind is ChannelKind.VIS else self.ui.set_panel.get_nir()
+                try:
+                    lam, spec = d.single_measurement(
+                        start_pixel=settings.start_pixel,
+                        stop_pixel=settings.stop_pixel,
+                        exposure_ms=settings.exposure_ms,
+                        n_averages=settings.n_averages,
+                        trigger_mode=settings.trigger_mode
+                    )
+                    sp = Spectrum(
+                        wavelength_nm=lam, counts=spec,
+                        ts_iso=iso_now(),
+                        settings_snapshot=settings,
+                        serial=d.serial, role=role if role != "abs" else "abs"
+                    )
+                    # Store to calib slot
+                    if role == "reference": ch.calib.reference = sp
+                    elif role == "dark": ch.calib.dark = sp
+                    elif role == "abs": ch.calib.abs_cal = sp
+                    elif role == "sample": ch.calib.sample = sp
+
+                    # UI indicator
+                    entry = self.ui.meas_panel.calib_entries[key]
+                    meta = f"{len(lam)} px, {settings.exposure_ms:.2f} ms, {sp.ts_iso}"
+                    if kind is ChannelKind.VIS:
+                        entry.vis_ind.set_green(); entry.vis_meta.setText(meta)
+                    else:
+                        entry.nir_ind.set_green(); entry.nir_meta.setText(meta)
+
+                    # Save to CSV
+                    folder = Path(self.ui.meas_panel.save_dir_path or self.state.save_dir)
+                    out = save_spectrum_csv(kind, sp, folder)
+                    msgs.append(f"[INFO] Saved {kind.value} {role} → {out}")
+
+                except Exception as e:
+                    entry = self.ui.meas_panel.calib_entries[key]
+                    if kind is ChannelKind.VIS: entry.vis_ind.set_red()
+                    else: entry.nir_ind.set_red()
+                    msgs.append(f"[ERROR] {kind.value} {role} measurement failed: {e}")
+        finally:
+            entry_widget.setUpdatesEnabled(True)
+            self.log_many(msgs)
 
         self.update_reflectance_plot()
 
     # ---------------- Reflectance ----------------
 
-    def update_reflectance_plot(self):
-        lam_vis = refl_vis = None
-        lam_nir = refl_nir = None
+    def _update_channel_reflectance(self, ch: ChannelState) -> bool:
+        """Recompute ch.reflectance if its calibration inputs changed; returns True if it did."""
+        cal = ch.calib
+        inputs = (cal.sample, cal.reference, cal.dark)
+        last = self._refl_inputs[ch.kind]
+        if last is not None and all(a is b for a, b in zip(inputs, last)):
+            return False
+        self._refl_inputs[ch.kind] = inputs
 
-        # VIS
-        cal = self.state.vis.calib
+        ch.reflectance = None
         if cal.is_complete_for_reflectance():
             try:
-                lam_vis, refl_vis = compute_reflectance(cal.sample, cal.reference, cal.dark)
+                ch.reflectance = compute_reflectance(cal.sample, cal.reference, cal.dark)
             except Exception as e:
-                self.log(f"[WARNING] VIS reflectance not computed: {e}")
+                self.log(f"[WARNING] {ch.kind.value} reflectance not computed: {e}")
+        return True
 
-        # NIR
-        cal = self.state.nir.calib
-        if cal.is_complete_for_reflectance():
-            try:
-                lam_nir, refl_nir = compute_reflectance(cal.sample, cal.reference, cal.dark)
-            except Exception as e:
-                self.log(f"[WARNING] NIR reflectance not computed: {e}")
+    def update_reflectance_plot(self):
+        vis_changed = self._update_channel_reflectance(self.state.vis)
+        nir_changed = self._update_channel_reflectance(self.state.nir)
+        if not (vis_changed or nir_changed):
+            return
 
+        lam_vis, refl_vis = self.state.vis.reflectance or (None, None)
+        lam_nir, refl_nir = self.state.nir.reflectance or (None, None)
         self.ui.resp_panel.reflect_widget.plot_two(lam_vis=lam_vis, refl_vis=refl_vis,
                                                    lam_nir=lam_nir, refl_nir=refl_nir)
 
@@ -492,20 +573,16 @@ class Controller:
 
         self.log(f"[INFO] Loaded sample → {path}")
 
-        lam_v, spec_v = (self.state.vis.latest_sample.wavelength_nm, self.state.vis.latest_sample.counts) if self.state.vis.latest_sample else (None, None)
-        lam_n, spec_n = (self.state.nir.latest_sample.wavelength_nm, self.state.nir.latest_sample.counts) if self.state.nir.latest_sample else (None, None)
-        vs = saturation_percent(spec_v) if spec_v is not None else None
-        ns = saturation_percent(spec_n) if spec_n is not None else None
-        self.ui.resp_panel.spectrum_widget.plot_two(lam_vis=lam_v, spec_vis=spec_v, vis_sat=vs,
-                                                    lam_nir=lam_n, spec_nir=spec_n, nir_sat=ns)
+        self._plot_latest()
 
         # Update "Sample" entry metadata quickly
+        self._cont_vis_bounds = self._cont_nir_bounds = None
         entry = self.ui.meas_panel.calib_entries["sample"]
         if chan is ChannelKind.VIS:
             entry.vis_ind.set_green()
-            entry.vis_meta.setText(f"{sp.wavelength_nm.min():.2f} – {sp.wavelength_nm.max():.2f} nm")
+            entry.vis_meta.setText(RANGE_META_FMT.format(lo=sp.lam_min, hi=sp.lam_max))
         else:
             entry.nir_ind.set_green()
-            entry.nir_meta.setText(f"{sp.wavelength_nm.min():.2f} – {sp.wavelength_nm.max():.2f} nm")
+            entry.nir_meta.setText(RANGE_META_FMT.format(lo=sp.lam_min, hi=sp.lam_max))
 
         self.update_reflectance_plot()
@@ -1,17 +1,67 @@
 # app/threads.py
 
-from PyQt5.QtCore import QThread, pyqtSignal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtCore import QObject, QRunnable, QThread, pyqtSignal
 from typing import Optional
-from datetime import datetime
 from core.constants import ChannelKind
 from core.models import SpectrometerSettings, Spectrum
-from core.analysis import saturation_percent
+from core.timestamps import iso_now
+
+def _acquire(dev, settings: SpectrometerSettings, ts_iso: str, role: str) -> Optional[Spectrum]:
+    """One measurement on `dev`, or None if the device is not connected."""
+    if not getattr(dev, "handle", None):
+        return None
+    lam, spec = dev.single_measurement(
+        start_pixel=settings.start_pixel,
+        stop_pixel=settings.stop_pixel,
+        exposure_ms=settings.exposure_ms,
+        n_averages=settings.n_averages,
+        trigger_mode=settings.trigger_mode
+    )
+    return Spectrum(
+        wavelength_nm=lam, counts=spec,
+        ts_iso=ts_iso,
+        settings_snapshot=settings,
+        serial=dev.serial, role=role
+    )
+
+class SingleMeasurementSignals(QObject):
+    result = pyqtSignal(object, object)  # ChannelKind, Spectrum
+    error = pyqtSignal(object, str)      # ChannelKind, message
+
+class SingleMeasurementTask(QRunnable):
+    """
+    One-shot sample measurement for QThreadPool; reports through a shared
+    SingleMeasurementSignals owned by the GUI thread.
+    """
+    def __init__(self, kind: ChannelKind, dev, settings: SpectrometerSettings,
+                 signals: SingleMeasurementSignals):
+        super().__init__()
+        self.kind = kind
+        self.dev = dev
+        self.settings = settings
+        self.signals = signals
+
+    def run(self):
+        try:
+            sp = _acquire(self.dev, self.settings, iso_now(), "sample")
+            if sp is None:
+                raise RuntimeError("device not connected")
+        except Exception as e:
+            self.signals.error.emit(self.kind, str(e))
+            return
+        self.signals.result.emit(self.kind, sp)
 
 class ContinuousAcquisitionThread(QThread):
     """
-    Emits (kind, Spectrum) continuously while running.
+    Emits (vis Spectrum, nir Spectrum) once per tick while running;
+    a channel that was not measured this tick is None.
+    VIS and NIR are measured concurrently, so a tick takes max(VIS, NIR).
     """
-    new_spectrum = pyqtSignal(object, object)  # ChannelKind, Spectrum
+    new_tick = pyqtSignal(object, object)  # Optional[Spectrum] VIS, Optional[Spectrum] NIR
+
+    TICK_NS = 10_000_000  # 10 ms tick period
 
     def __init__(self, vis_dev, nir_dev, parent=None):
         super().__init__(parent)
@@ -32,46 +82,39 @@ class ContinuousAcquisitionThread(QThread):
         self._running = False
 
     def run(self):
-        while self._running:
-            try:
-                if getattr(self.vis_dev, "handle", None):
-                    lam, spec = self.vis_dev.single_measurement(
-                        start_pixel=self.vis_settings.start_pixel,
-                        stop_pixel=self.vis_settings.stop_pixel,
-                        exposure_ms=self.vis_settings.exposure_ms,
-                        n_averages=self.vis_settings.n_averages,
-                        trigger_mode=self.vis_settings.trigger_mode
-                    )
-                    sp = Spectrum(
-                        wavelength_nm=lam, counts=spec,
-                        ts_iso=datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
-                        settings_snapshot=self.vis_settings,
-                        serial=self.vis_dev.serial, role="sample"
-                    )
-                    self.new_spectrum.emit(ChannelKind.VIS, sp)
-                if getattr(self.nir_dev, "handle", None):
-                    lam, spec = self.nir_dev.single_measurement(
-                        start_pixel=self.nir_settings.start_pixel,
-                        stop_pixel=self.nir_settings.stop_pixel,
-                        exposure_ms=self.nir_settings.exposure_ms,
-                        n_averages=self.nir_settings.n_averages,
-                        trigger_mode=self.nir_settings.trigger_mode
-                    )
-                    sp = Spectrum(
-                        wavelength_nm=lam, counts=spec,
-                        ts_iso=datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
-                        settings_snapshot=self.nir_settings,
-                        serial=self.nir_dev.serial, role="sample"
-                    )
-                    self.new_spectrum.emit(ChannelKind.NIR, sp)
-            except Exception:
-                # swallow to keep loop alive; controller logs on receive
-                pass
-            self.msleep(10)  # yield to GUI
+        # NIR runs on a helper worker while this thread measures VIS
+        with ThreadPoolExecutor(max_workers=1) as nir_worker:
+            next_deadline = time.monotonic_ns() + self.TICK_NS
+            while self._running:
+                ts_iso = iso_now()
+                vis_sp = nir_sp = None
+                nir_job = nir_worker.submit(_acquire, self.nir_dev, self.nir_settings, ts_iso, "sample")
+                try:
+                    vis_sp = _acquire(self.vis_dev, self.vis_settings, ts_iso, "sample")
+                except Exception:
+                    # swallow to keep loop alive; controller logs on receive
+                    pass
+                try:
+                    nir_sp = nir_job.result()
+                except Exception:
+                    pass
+                # one cross-thread event per tick; a VIS result survives a NIR failure
+                if vis_sp is not None or nir_sp is not None:
+                    self.new_tick.emit(vis_sp, nir_sp)
+
+                # fixed cadence: sleep only for what is left of this tick
+                now = time.monotonic_ns()
+                if next_deadline > now:
+                    self.msleep((next_deadline - now) // 1_000_000)
+                    next_deadline += self.TICK_NS
+                else:
+                    # acquisition overran the tick; don't try to catch up
+                    next_deadline = now + self.TICK_NS
 
 class RepeatedAcquisitionThread(QThread):
     """
-    Emits (kind, Spectrum, idx) repeatedly for count times with interval seconds
+    Emits (kind, Spectrum, idx) repeatedly for count times with interval seconds.
+    VIS and NIR are measured concurrently within each repeat.
     """
     new_repeat = pyqtSignal(object, object, int)  # ChannelKind, Spectrum, idx
 
@@ -90,38 +133,19 @@ class RepeatedAcquisitionThread(QThread):
         self._running = False
 
     def run(self):
-        from datetime import datetime
-        for i in range(self.count):
-            if not self._running:
-                break
-            if getattr(self.vis_dev, "handle", None):
-                lam, spec = self.vis_dev.single_measurement(
-                    start_pixel=self.vis_settings.start_pixel,
-                    stop_pixel=self.vis_settings.stop_pixel,
-                    exposure_ms=self.vis_settings.exposure_ms,
-                    n_averages=self.vis_settings.n_averages,
-                    trigger_mode=self.vis_settings.trigger_mode
-                )
-                sp = Spectrum(
-                    wavelength_nm=lam, counts=spec,
-                    ts_iso=datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
-                    settings_snapshot=self.vis_settings,
-                    serial=self.vis_dev.serial, role="repeat"
-                )
-                self.new_repeat.emit(ChannelKind.VIS, sp, i)
-            if getattr(self.nir_dev, "handle", None):
-                lam, spec = self.nir_dev.single_measurement(
-                    start_pixel=self.nir_settings.start_pixel,
-                    stop_pixel=self.nir_settings.stop_pixel,
-                    exposure_ms=self.nir_settings.exposure_ms,
-                    n_averages=self.nir_settings.n_averages,
-                    trigger_mode=self.nir_settings.trigger_mode
-                )
-                sp = Spectrum(
-                    wavelength_nm=lam, counts=spec,
-                    ts_iso=datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
-                    settings_snapshot=self.nir_settings,
-                    serial=self.nir_dev.serial, role="repeat"
-                )
-                self.new_repeat.emit(ChannelKind.NIR, sp, i)
-            self.msleep(self.interval_ms)
+        with ThreadPoolExecutor(max_workers=1) as nir_worker:
+            for i in range(self.count):
+                if not self._running:
+                    break
+                ts_iso = iso_now()
+                nir_job = nir_worker.submit(_acquire, self.nir_dev, self.nir_settings, ts_iso, "repeat")
+                try:
+                    vis_sp = _acquire(self.vis_dev, self.vis_settings, ts_iso, "repeat")
+                finally:
+                    # never leave the NIR device mid-measurement
+                    nir_sp = nir_job.result()
+                if vis_sp is not None:
+                    self.new_repeat.emit(ChannelKind.VIS, vis_sp, i)
+                if nir_sp is not None:
+                    self.new_repeat.emit(ChannelKind.NIR, nir_sp, i)
+                self.msleep(self.interval_ms)
@@ -0,0 +1,18 @@
+# core/_numba_kernels.py
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    # fastmath without the no-NaN/no-Inf flags: the kernel writes NaN on purpose
+    @njit(cache=True, fastmath={"contract", "arcp", "reassoc"}, boundscheck=False)
+    def reflectance_kernel(S, R, D, out):
+        for i in range(S.shape[0]):
+            d = R[i] - D[i]
+            out[i] = (S[i] - D[i]) / d if d != 0.0 else np.nan
+else:
+    reflectance_kernel = None
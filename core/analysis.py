@@ -2,13 +2,8 @@
 
 import numpy as np
 from typing import Tuple
-from core.models import Spectrum
-from core.constants import FULL_SCALE_COUNTS
-
-def saturation_percent(counts: np.ndarray, full_scale: float = FULL_SCALE_COUNTS) -> float:
-    if counts is None or counts.size == 0:
-        return 0.0
-    return float(np.nanmax(counts) / full_scale * 100.0)
+from core.models import Spectrum, saturation_percent  # noqa: F401 (re-exported)
+from core._numba_kernels import reflectance_kernel
 
 def compute_reflectance(sample: Spectrum, reference: Spectrum, dark: Spectrum) -> Tuple[np.ndarray, np.ndarray]:
     """
@@ -22,13 +17,28 @@ def compute_reflectance(sample: Spectrum, reference: Spectrum, dark: Spectrum) -
     # Strict equality requested by user (no resampling)
     if lam_s.shape != lam_r.shape or lam_s.shape != lam_d.shape:
         raise ValueError("Wavelength grids must match exactly (shape mismatch).")
-    if not (np.allclose(lam_s, lam_r) and np.allclose(lam_s, lam_d)):
+    # Spectra from the same device share one wavelength array, so identity
+    # settles the common case without scanning the values.
+    same_r = lam_r is lam_s or np.allclose(lam_s, lam_r)
+    same_d = lam_d is lam_s or np.allclose(lam_s, lam_d)
+    if not (same_r and same_d):
         raise ValueError("Wavelength grids must match exactly (values mismatch).")
 
+    # the kernel indexes without bounds checks, so counts must line up exactly
+    if not (sample.counts.shape == reference.counts.shape == dark.counts.shape):
+        raise ValueError("Counts arrays must have the same shape.")
+
+    if reflectance_kernel is not None:
+        out = np.empty(sample.counts.shape, dtype=np.result_type(sample.counts, reference.counts, dark.counts))
+        reflectance_kernel(sample.counts, reference.counts, dark.counts, out)
+        return lam_s, out
+
+    # num becomes the output buffer: divide in place where den != 0, NaN elsewhere
     num = sample.counts - dark.counts
     den = reference.counts - dark.counts
+    zero = den == 0
 
-    with np.errstate(divide='ignore', invalid='ignore'):
-        refl = np.where(den != 0, num / den, np.nan)
+    np.divide(num, den, out=num, where=~zero)
+    num[zero] = np.nan
 
-    return lam_s, refl
+    return lam_s, num
@@ -1,8 +1,14 @@
 # core/devices.py
 
+import threading
 import time
 import numpy as np
 
+try:
+    import avaspec
+except (ImportError, OSError):  # driver package or its shared library missing
+    avaspec = None
+
 class Spectrometer:
     """
     Thin wrapper around avaspec for a single device.
@@ -13,12 +19,46 @@ class Spectrometer:
         self.serial = None
         self.num_pixels = 0
         self.wavelengths = None
+        # MeasConfigType per (start, stop, exposure, averages, trigger)
+        self._cfg_cache = {}
+        # (handle, key) of the config the device was last prepared with
+        self._prepared = None
+        # serialises prepare/measure/read so concurrent callers can't interleave configs
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _build_cfg(start_pixel: int, stop_pixel: int, exposure_ms: float, n_averages: int, trigger_mode: int):
+        cfg = avaspec.MeasConfigType()
+        cfg.m_StartPixel = start_pixel
+        cfg.m_StopPixel = stop_pixel
+        cfg.m_IntegrationTime = exposure_ms
+        cfg.m_IntegrationDelay = 0
+        cfg.m_NrAverages = n_averages
+        cfg.m_CorDynDark_m_Enable = 0
+        cfg.m_CorDynDark_m_ForgetPercentage = 0
+        cfg.m_Smoothing_m_SmoothPix = 0
+        cfg.m_Smoothing_m_SmoothModel = 0
+        cfg.m_SaturationDetection = 0
+        cfg.m_Trigger_m_Mode = trigger_mode
+        cfg.m_Trigger_m_Source = 0
+        cfg.m_Trigger_m_SourceType = 0
+        cfg.m_Control_m_StrobeControl = 0
+        cfg.m_Control_m_LaserDelay = 0
+        cfg.m_Control_m_LaserWidth = 0
+        cfg.m_Control_m_LaserWaveLength = 0.0
+        cfg.m_Control_m_StoreToRam = 1
+        return cfg
 
     def get_device_info(self):
         if not self.handle or self.handle <= 0:
             raise RuntimeError("get_device_info: invalid handle")
+        if avaspec is None:
+            raise RuntimeError("get_device_info: avaspec library not available")
+
+        # freshly activated (handles are reused after AVS_Done): nothing is prepared yet
+        with self._lock:
+            self._prepared = None
 
-        import avaspec
         num_pix = avaspec.AVS_GetNumPixels(self.handle)
         if num_pix < 1:
             raise RuntimeError("AVS_GetNumPixels returned <1")
@@ -30,11 +70,16 @@ class Spectrometer:
             err_code, c_lambda = lam_ret
             if err_code < 0:
                 raise RuntimeError(f"AVS_GetLambda error {err_code}")
-            raw = np.array(c_lambda, dtype=float)
         else:
-            raw = np.array(lam_ret, dtype=float)
+            c_lambda = lam_ret
 
-        self.wavelengths = raw[: self.num_pixels]
+        # read exactly num_pixels values; no full 4096-element copy
+        if isinstance(c_lambda, (tuple, list)):
+            self.wavelengths = np.fromiter(c_lambda, dtype=np.float64, count=self.num_pixels)
+        else:
+            self.wavelengths = np.frombuffer(c_lambda, dtype=np.float64, count=self.num_pixels)
+        # fixed for the device lifetime; shared (not copied) by state and every Spectrum
+        self.wavelengths.setflags(write=False)
 
     def single_measurement(self,
                            start_pixel: int,
@@ -49,42 +94,42 @@ class Spectrometer:
             raise RuntimeError("single_measurement: invalid handle")
         if self.wavelengths is None or self.num_pixels <= 0:
             raise RuntimeError("single_measurement: call get_device_info first")
+        if avaspec is None:
+            raise RuntimeError("single_measurement: avaspec library not available")
 
-        import avaspec
         if stop_pixel is None or stop_pixel < start_pixel:
             stop_pixel = self.num_pixels - 1
 
-        cfg = avaspec.MeasConfigType()
-        cfg.m_StartPixel = int(start_pixel)
-        cfg.m_StopPixel = int(stop_pixel)
-        cfg.m_IntegrationTime = float(exposure_ms)
-        cfg.m_IntegrationDelay = 0
-        cfg.m_NrAverages = int(n_averages)
-        cfg.m_CorDynDark_m_Enable = 0
-        cfg.m_CorDynDark_m_ForgetPercentage = 0
-        cfg.m_Smoothing_m_SmoothPix = 0
-        cfg.m_Smoothing_m_SmoothModel = 0
-        cfg.m_SaturationDetection = 0
-        cfg.m_Trigger_m_Mode = int(trigger_mode)
-        cfg.m_Trigger_m_Source = 0
-        cfg.m_Trigger_m_SourceType = 0
-        cfg.m_Control_m_StrobeControl = 0
-        cfg.m_Control_m_LaserDelay = 0
-        cfg.m_Control_m_LaserWidth = 0
-        cfg.m_Control_m_LaserWaveLength = 0.0
-        cfg.m_Control_m_StoreToRam = 1
+        key = (int(start_pixel), int(stop_pixel), float(exposure_ms), int(n_averages), int(trigger_mode))
+        cfg = self._cfg_cache.get(key)
+        if cfg is None:
+            cfg = self._cfg_cache[key] = self._build_cfg(*key)
 
-        ret = avaspec.AVS_PrepareMeasure(self.handle, cfg)
-        if ret < 0:
-            raise RuntimeError(f"AVS_PrepareMeasure failed ({ret})")
+        with self._lock:
+            # The device keeps its prepared config; only re-send it when it changed
+            if self._prepared != (self.handle, key):
+                self._prepared = None
+                ret = avaspec.AVS_PrepareMeasure(self.handle, cfg)
+                if ret < 0:
+                    raise RuntimeError(f"AVS_PrepareMeasure failed ({ret})")
+                self._prepared = (self.handle, key)
 
-        ret = avaspec.AVS_Measure(self.handle, 0, 1)
-        if ret < 0:
-            raise RuntimeError(f"AVS_Measure error ({ret})")
+            ret = avaspec.AVS_Measure(self.handle, 0, 1)
+            if ret < 0:
+                self._prepared = None
+                raise RuntimeError(f"AVS_Measure error ({ret})")
 
-        while avaspec.AVS_PollScan(self.handle) == 0:
-            time.sleep(0.001)
+            # Sleep through most of the expected integration, then poll with backoff
+            time.sleep(max(0.001, 0.9 * float(exposure_ms) * max(1, int(n_averages)) / 1000.0))
+            backoff = 0.0005
+            while avaspec.AVS_PollScan(self.handle) == 0:
+                backoff = min(0.005, backoff * 1.5)
+                time.sleep(backoff)
 
-        ts, c_spec = avaspec.AVS_GetScopeData(self.handle)
-        counts = np.array(c_spec[: self.num_pixels], dtype=np.float32)
-        return self.wavelengths, counts
+            ts, c_spec = avaspec.AVS_GetScopeData(self.handle)
+            if isinstance(c_spec, (tuple, list)):
+                raw = np.fromiter(c_spec, dtype=np.float64, count=self.num_pixels)
+            else:
+                # zero-copy view of the ctypes double array
+                raw = np.frombuffer(c_spec, dtype=np.float64, count=self.num_pixels)
+            return self.wavelengths, raw.astype(np.float32)
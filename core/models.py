@@ -4,7 +4,15 @@ from dataclasses import dataclass, field, replace
 from typing import Optional, List, Tuple
 import numpy as np
 from pathlib import Path
-from core.constants import ChannelKind
+from core.constants import ChannelKind, FULL_SCALE_COUNTS
+
+def saturation_percent(counts: np.ndarray, full_scale: float = FULL_SCALE_COUNTS) -> float:
+    if counts is None or counts.size == 0:
+        return 0.0
+    peak = float(counts.max())
+    if peak != peak:  # NaN present (loaded data only)
+        peak = float(np.nanmax(counts))
+    return peak * (100.0 / full_scale)
 
 @dataclass(frozen=True)
 class SpectrometerSettings:
@@ -20,14 +28,35 @@ class SpectrometerSettings:
     trigger_source: int = 0
     trigger_source_type: int = 0
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Spectrum:
     wavelength_nm: np.ndarray    # float64
-    counts: np.ndarray           # float32/float64
+    counts: np.ndarray           # float32
     ts_iso: str
     settings_snapshot: SpectrometerSettings
     serial: Optional[str]
     role: str                    # "sample" | "reference" | "dark" | "abs" | "repeat"
+    lam_min: float = field(init=False)   # wavelength bounds, cached once
+    lam_max: float = field(init=False)
+    sat_pct: float = field(init=False)   # peak counts as % of full scale
+    sat_label: str = field(init=False)   # "12.3% sat", formatted by the producing thread
+
+    def __post_init__(self):
+        # frozen, so the derived fields can't go stale; set them once here
+        set_ = object.__setattr__
+        # grids are monotonic (loaded files may be descending), so the ends are the bounds
+        lam = self.wavelength_nm
+        if lam is not None and len(lam) > 0:
+            a, b = float(lam[0]), float(lam[-1])
+            lo, hi = (a, b) if a <= b else (b, a)
+        else:
+            lo = hi = float("nan")
+        set_(self, "lam_min", lo)
+        set_(self, "lam_max", hi)
+
+        sat = saturation_percent(self.counts)
+        set_(self, "sat_pct", sat)
+        set_(self, "sat_label", f"{sat:.1f}% sat")
 
 @dataclass
 class CalibrationSet:
@@ -49,9 +78,17 @@ class ChannelState:
     settings: SpectrometerSettings = field(default_factory=SpectrometerSettings)
     calib: CalibrationSet = field(default_factory=CalibrationSet)
     latest_sample: Optional[Spectrum] = None
-    repeats_buffer: List[Spectrum] = field(default_factory=list)
+    repeats_matrix: Optional[np.ndarray] = None  # (n_lambda, n_meas) float32
+    repeats_filled: int = 0  # columns of repeats_matrix written so far
     reflectance: Optional[Tuple[np.ndarray, np.ndarray]] = None  # (λ, R)
 
+    def reset_repeats(self, count: int):
+        self.repeats_filled = 0
+        if self.connected and self.num_pixels > 0:
+            self.repeats_matrix = np.empty((self.num_pixels, int(count)), dtype=np.float32)
+        else:
+            self.repeats_matrix = None
+
 @dataclass
 class SessionState:
     save_dir: Path
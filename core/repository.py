@@ -1,48 +1,76 @@
 # core/repository.py
 
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Tuple, Optional
 import numpy as np
 import time
 from core.models import Spectrum, SpectrometerSettings
 from core.constants import (
-    CSV_COMMENT_PREFIX, TIME_FORMAT_FILE, TIME_FORMAT_ISO,
+    CSV_COMMENT_PREFIX, TIME_FORMAT_FILE,
     ChannelKind, VIS_NIR_SPLIT_NM
 )
+from core.timestamps import iso_now
 
-def _settings_to_header_lines(settings: SpectrometerSettings) -> List[str]:
-    return [
-        f"{CSV_COMMENT_PREFIX}start_pixel: {settings.start_pixel}",
-        f"{CSV_COMMENT_PREFIX}stop_pixel: {settings.stop_pixel}",
-        f"{CSV_COMMENT_PREFIX}exposure_ms: {settings.exposure_ms:.6f}",
-        f"{CSV_COMMENT_PREFIX}n_averages: {settings.n_averages}",
-        f"{CSV_COMMENT_PREFIX}cordyn_dark: {int(settings.cordyn_dark)}",
-        f"{CSV_COMMENT_PREFIX}smooth_pix: {settings.smooth_pix}",
-        f"{CSV_COMMENT_PREFIX}smooth_model: {settings.smooth_model}",
-        f"{CSV_COMMENT_PREFIX}saturation_detection: {int(settings.saturation_detection)}",
-        f"{CSV_COMMENT_PREFIX}trigger_mode: {settings.trigger_mode}",
-        f"{CSV_COMMENT_PREFIX}trigger_source: {settings.trigger_source}",
-        f"{CSV_COMMENT_PREFIX}trigger_source_type: {settings.trigger_source_type}",
-    ]
+_P = CSV_COMMENT_PREFIX
+_ROLE_UPPER = {"sample": "SAMPLE", "reference": "REFERENCE", "dark": "DARK", "abs": "ABS", "repeat": "REPEAT"}
+_VIS_PREFIXES = ("VIS_", "REP_VIS_")
+_NIR_PREFIXES = ("NIR_", "REP_NIR_")
+
+def _settings_to_header(settings: SpectrometerSettings) -> str:
+    return "\n".join((
+        f"{_P}start_pixel: {settings.start_pixel}",
+        f"{_P}stop_pixel: {settings.stop_pixel}",
+        f"{_P}exposure_ms: {settings.exposure_ms:.6f}",
+        f"{_P}n_averages: {settings.n_averages}",
+        f"{_P}cordyn_dark: {int(settings.cordyn_dark)}",
+        f"{_P}smooth_pix: {settings.smooth_pix}",
+        f"{_P}smooth_model: {settings.smooth_model}",
+        f"{_P}saturation_detection: {int(settings.saturation_detection)}",
+        f"{_P}trigger_mode: {settings.trigger_mode}",
+        f"{_P}trigger_source: {settings.trigger_source}",
+        f"{_P}trigger_source_type: {settings.trigger_source_type}",
+    ))
+
+def _write_csv(fpath: Path, x: np.ndarray, ys: np.ndarray, header: str,
+               fmt: str = "%.18e", chunk_rows: int = 512):
+    """
+    Same output as np.savetxt(column_stack((x, ys)), delimiter=",", comments=CSV_COMMENT_PREFIX).
+    Rows are stacked into one reused block buffer and formatted a chunk at a time
+    with a single %-operation, so no full-size stacked copy or text blob is built.
+    """
+    n_rows = len(x)
+    if n_rows:  # reshape(0, -1) is ambiguous; an empty table is header-only, as with np.savetxt
+        ys = ys.reshape(n_rows, -1)
+        n_cols = ys.shape[1] + 1
+        row_fmt = ",".join([fmt] * n_cols) + "\n"
+        block = np.empty((min(chunk_rows, n_rows), n_cols), dtype=np.float64)
+    with open(fpath, "w", buffering=1 << 20) as f:
+        f.write(CSV_COMMENT_PREFIX + header.replace("\n", "\n" + CSV_COMMENT_PREFIX) + "\n")
+        for i in range(0, n_rows, chunk_rows):
+            j = min(i + chunk_rows, n_rows)
+            b = block[: j - i]
+            b[:, 0] = x[i:j]
+            b[:, 1:] = ys[i:j]
+            f.write((row_fmt * (j - i)) % tuple(b.ravel().tolist()))
 
 def save_spectrum_csv(channel: ChannelKind, spectrum: Spectrum, folder: Path, name_hint: Optional[str] = None) -> Path:
     folder.mkdir(parents=True, exist_ok=True)
     ts = time.strftime(TIME_FORMAT_FILE)
-    role_token = spectrum.role.upper()
+    role_token = _ROLE_UPPER.get(spectrum.role) or spectrum.role.upper()
     base_name = name_hint.strip() if name_hint else f"{role_token}"
     fname = f"{channel.value}_{base_name}_{ts}.csv"
     fpath = folder / fname
 
-    header_lines = [f"{CSV_COMMENT_PREFIX}wavelength,counts"]
-    header_lines.append(f"{CSV_COMMENT_PREFIX}channel: {channel.value}")
-    header_lines.append(f"{CSV_COMMENT_PREFIX}role: {spectrum.role}")
-    header_lines.append(f"{CSV_COMMENT_PREFIX}serial: {spectrum.serial or ''}")
-    header_lines.append(f"{CSV_COMMENT_PREFIX}timestamp: {spectrum.ts_iso}")
-    header_lines.extend(_settings_to_header_lines(spectrum.settings_snapshot))
-    header = "\n".join(header_lines)
+    header = (
+        f"{_P}wavelength,counts\n"
+        f"{_P}channel: {channel.value}\n"
+        f"{_P}role: {spectrum.role}\n"
+        f"{_P}serial: {spectrum.serial or ''}\n"
+        f"{_P}timestamp: {spectrum.ts_iso}\n"
+        + _settings_to_header(spectrum.settings_snapshot)
+    )
 
-    arr = np.column_stack((spectrum.wavelength_nm, spectrum.counts))
-    np.savetxt(str(fpath), arr, delimiter=",", header=header, comments=CSV_COMMENT_PREFIX)
+    _write_csv(fpath, spectrum.wavelength_nm, spectrum.counts, header)
     return fpath
 
 def save_repeats_csv(channel: ChannelKind, wavelength_nm: np.ndarray, repeats_counts: np.ndarray, folder: Path, name_hint: Optional[str]) -> Path:
@@ -59,15 +87,14 @@ def save_repeats_csv(channel: ChannelKind, wavelength_nm: np.ndarray, repeats_co
     header_cols = ["wavelength"] + [f"meas{i+1}" for i in range(n_meas)]
     header = CSV_COMMENT_PREFIX + ",".join(header_cols)
 
-    out = np.column_stack((wavelength_nm, repeats_counts))
-    np.savetxt(str(fpath), out, delimiter=",", header=header, comments=CSV_COMMENT_PREFIX)
+    _write_csv(fpath, wavelength_nm, repeats_counts, header)
     return fpath
 
 def _infer_channel_from_file_and_data(path: Path, wavelength_nm: np.ndarray) -> ChannelKind:
     upper = path.name.upper()
-    if upper.startswith("VIS_") or upper.startswith("REP_VIS_"):
+    if upper.startswith(_VIS_PREFIXES):
         return ChannelKind.VIS
-    if upper.startswith("NIR_") or upper.startswith("REP_NIR_"):
+    if upper.startswith(_NIR_PREFIXES):
         return ChannelKind.NIR
     # fallback on wavelength range
     return ChannelKind.VIS if float(np.nanmax(wavelength_nm)) < VIS_NIR_SPLIT_NM else ChannelKind.NIR
@@ -78,12 +105,25 @@ def load_spectrum_csv(path: Path) -> Tuple[ChannelKind, Spectrum]:
     Ignores commented lines (starting with '# ').
     """
     path = Path(path)
-    data = np.loadtxt(str(path), delimiter=",", comments="#")
-    if data.ndim == 1:
-        # ensure 2D
-        data = data.reshape(1, -1)
-    wavelength = data[:, 0].astype(float)
-    counts = data[:, 1].astype(float)
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+
+    if pd is not None:
+        # C tokenizer; much faster than loadtxt on multi-thousand-pixel files
+        df = pd.read_csv(str(path), comment="#", header=None, usecols=[0, 1],
+                         dtype={0: np.float64, 1: np.float32}, engine="c")
+        wavelength = df[0].to_numpy()
+        counts = df[1].to_numpy()
+    else:
+        data = np.loadtxt(str(path), delimiter=",", comments="#")
+        if data.ndim == 1:
+            # ensure 2D
+            data = data.reshape(1, -1)
+        # loadtxt already returns float64; counts are kept as float32 like device data
+        wavelength = data[:, 0]
+        counts = data[:, 1].astype(np.float32)
 
     # metadata is optional here; set safe defaults
     settings = SpectrometerSettings()
@@ -91,7 +131,7 @@ def load_spectrum_csv(path: Path) -> Tuple[ChannelKind, Spectrum]:
     spectrum = Spectrum(
         wavelength_nm=wavelength,
         counts=counts,
-        ts_iso=time.strftime(TIME_FORMAT_ISO),
+        ts_iso=iso_now(),
         settings_snapshot=settings,
         serial=None,
         role="sample"
@@ -0,0 +1,16 @@
+# core/timestamps.py
+
+import time
+from functools import lru_cache
+from core.constants import TIME_FORMAT_ISO
+
+# bound once; iso_now() runs on every measurement
+_time = time.time
+
+@lru_cache(maxsize=1)
+def _iso_for_second(sec: int) -> str:
+    return time.strftime(TIME_FORMAT_ISO, time.localtime(sec))
+
+def iso_now() -> str:
+    """Local time as TIME_FORMAT_ISO; formatted at most once per second."""
+    return _iso_for_second(int(_time()))
@@ -29,6 +29,14 @@ def main():
     # UI defaults
     pg.setConfigOption('background', 'w')
     pg.setConfigOption('foreground', 'k')
+    # Opt-in GPU drawing for the plots (SFR_GUI_OPENGL=1); needs PyOpenGL
+    if os.environ.get("SFR_GUI_OPENGL") == "1":
+        try:
+            import OpenGL  # noqa: F401
+        except ImportError:
+            pass  # PyOpenGL missing: stay on raster drawing
+        else:
+            pg.setConfigOptions(useOpenGL=True, enableExperimental=True)
 
     app = QApplication(sys.argv)
     win = MainWindow()
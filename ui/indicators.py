@@ -1,16 +1,43 @@
 # ui/indicators.py
 
 from PyQt5.QtWidgets import QLabel
+from PyQt5.QtGui import QPixmap, QPainter, QColor
+from PyQt5.QtCore import Qt
+
+def _dot_pixmap(color: str, size: int = 12) -> QPixmap:
+    pix = QPixmap(size, size)
+    pix.fill(Qt.transparent)
+    p = QPainter(pix)
+    p.setRenderHint(QPainter.Antialiasing)
+    p.setPen(Qt.NoPen)
+    p.setBrush(QColor(color))
+    p.drawEllipse(0, 0, size - 1, size - 1)
+    p.end()
+    return pix
 
 class IndicatorLabel(QLabel):
     """Small circular indicator: red (off) or green (on)."""
+    # Shared pixmaps, built on first use (a QApplication must exist by then)
+    _green_pix = None
+    _red_pix = None
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setFixedSize(12, 12)
+        if IndicatorLabel._green_pix is None:
+            IndicatorLabel._green_pix = _dot_pixmap("green")
+            IndicatorLabel._red_pix = _dot_pixmap("red")
+        self._state = None
         self.set_red()
 
     def set_green(self):
-        self.setStyleSheet("background-color: green; border-radius: 6px;")
+        if self._state == "green":
+            return
+        self._state = "green"
+        self.setPixmap(self._green_pix)
 
     def set_red(self):
-        self.setStyleSheet("background-color: red; border-radius: 6px;")
+        if self._state == "red":
+            return
+        self._state = "red"
+        self.setPixmap(self._red_pix)
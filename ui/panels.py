@@ -2,7 +2,7 @@
 
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QLabel, QPushButton, QCheckBox,
-    QFileDialog, QLineEdit, QTabWidget, QFormLayout, QSpinBox, QDoubleSpinBox, QTextEdit
+    QFileDialog, QLineEdit, QTabWidget, QFormLayout, QSpinBox, QDoubleSpinBox, QPlainTextEdit, QSizePolicy
 )
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt
@@ -17,11 +17,16 @@ class CalibrationEntryWidget(QWidget):
         ("Absolute", "abs"),
         ("Sample", "sample"),
     ]
+    # Shared by every entry's meta labels, built on first use
+    _meta_font = None
 
     def __init__(self, label_txt: str, key: str, parent=None):
         super().__init__(parent)
         self.key = key
+        if CalibrationEntryWidget._meta_font is None:
+            CalibrationEntryWidget._meta_font = QFont("Arial", 8)
         lay = QVBoxLayout(self)
+        lay.setContentsMargins(0, 0, 0, 0)  # already inset by the Calibration group box
 
         # Header row
         hdr = QHBoxLayout()
@@ -39,7 +44,8 @@ class CalibrationEntryWidget(QWidget):
         row_v.addWidget(self.vis_ind)
         row_v.addWidget(QLabel("VIS:"))
         self.vis_meta = QLabel("No data")
-        self.vis_meta.setFont(QFont("Arial", 8))
+        self.vis_meta.setFont(self._meta_font)
+        self._static_label(self.vis_meta)
         row_v.addWidget(self.vis_meta)
         row_v.addStretch()
         lay.addLayout(row_v)
@@ -50,20 +56,35 @@ class CalibrationEntryWidget(QWidget):
         row_n.addWidget(self.nir_ind)
         row_n.addWidget(QLabel("NIR:"))
         self.nir_meta = QLabel("No data")
-        self.nir_meta.setFont(QFont("Arial", 8))
+        self.nir_meta.setFont(self._meta_font)
+        self._static_label(self.nir_meta)
         row_n.addWidget(self.nir_meta)
         row_n.addStretch()
         lay.addLayout(row_n)
 
+    @staticmethod
+    def _static_label(lbl: QLabel):
+        # plain status text: no text interaction, repaint only newly exposed areas
+        lbl.setAttribute(Qt.WA_StaticContents, True)
+        lbl.setTextInteractionFlags(Qt.NoTextInteraction)
+        lbl.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+
 class MeasurementPanel(QWidget):
     """Left column: connections, folder, single/continuous/repeated, calibration."""
     def __init__(self, parent=None):
         super().__init__(parent)
         self._save_dir_path = None
-        self._build_ui()
+        # build the whole tree, then paint once
+        self.setUpdatesEnabled(False)
+        try:
+            self._build_ui()
+        finally:
+            self.setUpdatesEnabled(True)
 
     def _build_ui(self):
         main = QVBoxLayout(self)
+        main.setContentsMargins(0, 0, 0, 0)
+        main.setSpacing(4)
 
         # Connection row
         conn = QHBoxLayout()
@@ -184,7 +205,11 @@ class RightPanel(QWidget):
         # Log panel
         log_box = QGroupBox("Log")
         log_lay = QVBoxLayout(log_box)
-        self.log_txt = QTextEdit(); self.log_txt.setReadOnly(True)
+        # plain-text log; oldest lines are dropped past the block limit
+        self.log_txt = QPlainTextEdit(); self.log_txt.setReadOnly(True)
+        self.log_txt.setMaximumBlockCount(5000)
+        self.log_txt.setUndoRedoEnabled(False)
+        self.log_txt.setLineWrapMode(QPlainTextEdit.NoWrap)
         log_lay.addWidget(self.log_txt)
         lay.addWidget(log_box, 1)
 
@@ -243,14 +268,29 @@ class SettingsPanel(QWidget):
 
         self.tabs = QTabWidget()
         self.vis_set = SpectrometerSettingsPanel()
-        self.nir_set = SpectrometerSettingsPanel()
         self.tabs.addTab(self.vis_set, "VIS")
-        self.tabs.addTab(self.nir_set, "NIR")
+        # NIR settings are built on first use (tab opened, device connected, or read)
+        self.nir_set = None
+        self._nir_page = QWidget()
+        self._nir_lay = QVBoxLayout(self._nir_page)
+        self._nir_lay.setContentsMargins(0, 0, 0, 0)
+        self.tabs.addTab(self._nir_page, "NIR")
+        self.tabs.currentChanged.connect(self._on_tab_changed)
         v.addWidget(self.tabs)
         lay.addWidget(box)
 
+    def _on_tab_changed(self, index):
+        if self.tabs.widget(index) is self._nir_page:
+            self.nir_panel()
+
+    def nir_panel(self):
+        if self.nir_set is None:
+            self.nir_set = SpectrometerSettingsPanel()
+            self._nir_lay.addWidget(self.nir_set)
+        return self.nir_set
+
     def get_vis(self):
         return self.vis_set.get_settings()
 
     def get_nir(self):
-        return self.nir_set.get_settings()
+        return self.nir_panel().get_settings()
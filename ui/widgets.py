@@ -1,29 +1,164 @@
 # ui/widgets.py
 
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSlider, QCheckBox,
-    QGroupBox, QTextEdit, QDoubleSpinBox
+    QWidget, QGridLayout, QHBoxLayout, QLabel, QSlider, QCheckBox,
+    QGroupBox, QTextEdit, QDoubleSpinBox, QGraphicsItem
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 import pyqtgraph as pg
 import numpy as np
+from core.constants import ChannelKind
 
 
 # ---- helper: window the spectrum to a wavelength interval -----------------
-def _slice_by_wavelength(wl, y, start_nm, stop_nm):
-    """Return wl,y limited to [min(start,stop), max(start,stop)]."""
-    if wl is None or y is None:
-        return wl, y
-    if len(wl) == 0:
-        return wl, y
-    lo, hi = (start_nm, stop_nm) if start_nm <= stop_nm else (stop_nm, start_nm)
-    wl = np.asarray(wl)
-    y  = np.asarray(y)
-    m = (wl >= lo) & (wl <= hi)
-    if not np.any(m):
-        # return empty arrays of correct dtype; plot will blank (intended)
-        return wl[:0], y[:0]
-    return wl[m], y[m]
+def _window_idx(wl, lo, hi):
+    """(i0, i1) such that wl[i0:i1] lies in [min(lo,hi), max(lo,hi)]; wl is a non-empty monotonic ndarray."""
+    if lo > hi:
+        lo, hi = hi, lo
+    # binary-search the bounds; callers slice (views, no copies)
+    if wl[0] <= wl[-1]:
+        return np.searchsorted(wl, lo, side='left'), np.searchsorted(wl, hi, side='right')
+    n = len(wl)
+    rev = wl[::-1]
+    return n - np.searchsorted(rev, hi, side='right'), n - np.searchsorted(rev, lo, side='left')
+
+
+def _lam_bounds(lam):
+    """(min, max) of a non-empty monotonic wavelength grid, from its endpoints."""
+    a, b = float(lam[0]), float(lam[-1])
+    return (a, b) if a <= b else (b, a)
+
+
+def _f32_grid(cache, idx, lam):
+    """float32 contiguous copy of `lam`, reused while the same array keeps coming in."""
+    if lam is None:
+        return None
+    src, f32 = cache[idx]
+    if src is not lam:
+        f32 = np.ascontiguousarray(lam, dtype=np.float32)
+        cache[idx] = (lam, f32)  # holding `lam` keeps the identity check sound
+    return f32
+
+
+# shared pens (mkPen pens are cosmetic: 1 px regardless of zoom)
+_PEN_VIS = pg.mkPen('b', width=1)
+_PEN_NIR = pg.mkPen('r', width=1)
+
+# shared empty data for blanked curves
+_EMPTY = np.empty(0, dtype=np.float32)
+
+
+def _same_window(src, lam, y, i0, i1):
+    """True if `src` (lam, y, i0, i1) holds these very arrays and bounds."""
+    return src is not None and src[0] is lam and src[1] is y and src[2] == i0 and src[3] == i1
+
+
+def _as_array(a):
+    """`a` as a C-contiguous float32 ndarray; returned as-is when it already is one."""
+    return None if a is None else np.ascontiguousarray(a, dtype=np.float32)
+
+
+class _Throttled:
+    """Call fn(value) at most once per interval; the last value of a burst always lands."""
+    def __init__(self, fn, interval_ms, parent):
+        self._fn = fn
+        self._pending = None
+        self._timer = QTimer(parent)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._flush)
+
+    def __call__(self, value):
+        if self._timer.isActive():
+            self._pending = value
+            return
+        self._fn(value)
+        self._timer.start()
+
+    def _flush(self):
+        if self._pending is not None:
+            value, self._pending = self._pending, None
+            self._fn(value)
+            self._timer.start()
+
+
+_OVERLAY_HTML = (
+    '<div style="background-color: rgba(255,255,255,220); '
+    'color: black; padding: 6px; border: 1px solid black; border-radius: 4px;">'
+    '{text}'
+    '</div>'
+)
+
+
+class PercentAxis(pg.AxisItem):
+    """Axis for 0..1 fractions that labels its ticks in percent."""
+    def tickStrings(self, values, scale, spacing):
+        return super().tickStrings([v * 100.0 for v in values], scale, spacing * 100.0)
+
+
+# =============================================================================
+# WavelengthWindowBar (shared VIS/NIR display-range controls)
+# =============================================================================
+class WavelengthWindowBar(QGroupBox):
+    """One-row "VIS: [start] – [stop]   NIR: [start] – [stop]" display-range controls."""
+    rangeChanged = pyqtSignal(float, float, float, float)  # vis start, vis stop, nir start, nir stop
+
+    def __init__(self, parent=None):
+        super().__init__("Display range (nm)", parent)
+        lay = QHBoxLayout(self)
+
+        # VIS mini-group: "VIS: [start] – [stop]"
+        self.lbl_vis = QLabel("VIS:")
+        self.vis_start = self._box(400.0)
+        self.lbl_dash_vis = QLabel("–")
+        self.vis_stop  = self._box(900.0)
+
+        # NIR mini-group: "NIR: [start] – [stop]"
+        self.lbl_nir = QLabel("NIR:")
+        self.nir_start = self._box(900.0)
+        self.lbl_dash_nir = QLabel("–")
+        self.nir_stop  = self._box(1700.0)
+
+        lay.addWidget(self.lbl_vis);      lay.addWidget(self.vis_start)
+        lay.addWidget(self.lbl_dash_vis); lay.addWidget(self.vis_stop)
+        lay.addSpacing(15)
+        lay.addWidget(self.lbl_nir);      lay.addWidget(self.nir_start)
+        lay.addWidget(self.lbl_dash_nir); lay.addWidget(self.nir_stop)
+        lay.addStretch()
+
+        self.spins = (self.vis_start, self.vis_stop, self.nir_start, self.nir_stop)
+        for sb in self.spins:
+            sb.valueChanged.connect(self._emit_range)
+
+    @staticmethod
+    def _box(val):
+        b = QDoubleSpinBox()
+        b.setRange(200, 2500)     # safe global bounds; later clamped to data
+        b.setDecimals(1)
+        b.setSingleStep(1.0)
+        b.setValue(val)
+        b.setMaximumWidth(80)     # compact
+        b.setKeyboardTracking(False)  # typed values emit once, on commit
+        return b
+
+    def _emit_range(self, *_):
+        self.rangeChanged.emit(*(sb.value() for sb in self.spins))
+
+    def clamp(self, idx, lo, hi):
+        """Limit channel `idx`'s (0 VIS, 1 NIR) spinboxes to [lo, hi] without emitting rangeChanged."""
+        start_sb, stop_sb = self.spins[2 * idx:2 * idx + 2]
+        start_sb.blockSignals(True); stop_sb.blockSignals(True)
+        try:
+            start_sb.setMinimum(lo)
+            stop_sb.setMaximum(hi)
+        finally:
+            start_sb.blockSignals(False); stop_sb.blockSignals(False)
+
+    def set_channels_visible(self, vis_show: bool, nir_show: bool):
+        for w in (self.lbl_vis, self.vis_start, self.lbl_dash_vis, self.vis_stop):
+            w.setVisible(vis_show)
+        for w in (self.lbl_nir, self.nir_start, self.lbl_dash_nir, self.nir_stop):
+            w.setVisible(nir_show)
 
 
 # =============================================================================
@@ -41,70 +176,74 @@ class SpectrumPlotWidget(QWidget):
         vb = self.plot.getViewBox()
         vb.setBorder(pg.mkPen('k', width=2))
 
-        self.vis_curve = self.plot.plot([], [], pen=pg.mkPen('b', width=1))
-        self.nir_curve = self.plot.plot([], [], pen=pg.mkPen('r', width=1))
+        # bare line items (no PlotDataItem scatter/step dispatch per setData);
+        # loaded sample files may hold NaN, so the finite check stays on;
+        # 1 px cosmetic lines look the same aliased, so antialiasing stays off
+        self.vis_curve = pg.PlotCurveItem(pen=_PEN_VIS, antialias=False)
+        self.nir_curve = pg.PlotCurveItem(pen=_PEN_NIR, antialias=False)
+        # reuse the rasterized curve when only legend/overlay items repaint; setData invalidates it
+        for curve in (self.vis_curve, self.nir_curve):
+            curve.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        self.plot.addItem(self.vis_curve)
+        self.plot.addItem(self.nir_curve)
 
         # --- Y-axis controls ---
-        y_controls = QHBoxLayout()
-        y_controls.addWidget(QLabel("Y-Max:"))
+        y_label = QLabel("Y-Max:")
         self.y_slider = QSlider(Qt.Horizontal)
         self.y_slider.setRange(0, 20000)
         self.y_slider.setValue(16500)
-        y_controls.addWidget(self.y_slider)
         self.autoscale_cb = QCheckBox("Autoscale Y-Axis")
-        y_controls.addWidget(self.autoscale_cb)
-        y_controls.addStretch()
-        self.y_slider.valueChanged.connect(self._update_range)
+        # ~30 Hz while dragging
+        self.y_slider.valueChanged.connect(_Throttled(self._update_range, 33, self))
         self.autoscale_cb.toggled.connect(self._toggle_autoscale)
 
         # --- Compact one-row wavelength controls (VIS and NIR) ---
-        self.wl_group = QGroupBox("Display range (nm)")
-        wl_layout = QHBoxLayout(self.wl_group)
-
-        def _box(val):
-            b = QDoubleSpinBox()
-            b.setRange(200, 2500)     # safe global bounds; later clamped to data
-            b.setDecimals(1)
-            b.setSingleStep(1.0)
-            b.setValue(val)
-            b.setMaximumWidth(80)     # compact
-            return b
+        self.wl_bar = WavelengthWindowBar()
+        self.vis_start, self.vis_stop, self.nir_start, self.nir_stop = self.wl_bar.spins
+        self.wl_bar.rangeChanged.connect(self._on_wl_changed)
+
+        # Coalesce bursts of spinbox changes into one replot
+        self._replot_timer = QTimer(self)
+        self._replot_timer.setSingleShot(True)
+        self._replot_timer.setInterval(40)
+        self._replot_timer.timeout.connect(self._do_replot)
+
+        # --- main layout: one grid (plot / Y controls / wavelength bar) ---
+        grid = QGridLayout(self)
+        grid.addWidget(self.plot, 0, 0, 1, 4)
+        grid.addWidget(y_label, 1, 0)
+        grid.addWidget(self.y_slider, 1, 1)
+        grid.addWidget(self.autoscale_cb, 1, 2)
+        grid.addWidget(self.wl_bar, 2, 0, 1, 4)
+        grid.setRowStretch(0, 1)
+        grid.setColumnStretch(1, 1)  # slider and trailing space share the width
+        grid.setColumnStretch(3, 1)
 
-        # VIS mini-group: "VIS: [start] – [stop]"
-        self.lbl_vis = QLabel("VIS:")
-        self.vis_start = _box(400.0)
-        self.lbl_dash_vis = QLabel("–")
-        self.vis_stop  = _box(900.0)
+        # cache last arrays so spinbox changes re-apply without caller involvement
+        self._last_vis = (None, None, None)   # (lam_vis, spec_vis, vis_label)
+        self._last_nir = (None, None, None)   # (lam_nir, spec_nir, nir_label)
 
-        # NIR mini-group: "NIR: [start] – [stop]"
-        self.lbl_nir = QLabel("NIR:")
-        self.nir_start = _box(900.0)
-        self.lbl_dash_nir = QLabel("–")
-        self.nir_stop  = _box(1700.0)
+        # persistent flags: has this channel ever had data?
+        self._has_vis_data = False
+        self._has_nir_data = False
 
-        wl_layout.addWidget(self.lbl_vis);      wl_layout.addWidget(self.vis_start)
-        wl_layout.addWidget(self.lbl_dash_vis); wl_layout.addWidget(self.vis_stop)
-        wl_layout.addSpacing(15)
-        wl_layout.addWidget(self.lbl_nir);      wl_layout.addWidget(self.nir_start)
-        wl_layout.addWidget(self.lbl_dash_nir); wl_layout.addWidget(self.nir_stop)
-        wl_layout.addStretch()
+        # (lam, spec, i0, i1) currently shown by each curve (VIS, NIR)
+        self._curve_src = [None, None]
 
-        for sb in (self.vis_start, self.vis_stop, self.nir_start, self.nir_stop):
-            sb.valueChanged.connect(self._on_wl_changed)
+        # max of each curve's drawn window (VIS, NIR) and the last autoscaled Y max
+        self._win_ymax = [0.0, 0.0]
+        self._applied_ymax = None
 
-        # --- main layout ---
-        lay = QVBoxLayout(self)
-        lay.addWidget(self.plot)
-        lay.addLayout(y_controls)
-        lay.addWidget(self.wl_group)
+        # legend LabelItems (VIS, NIR), their current texts and the labels they came from
+        self._legend_labels = None
+        self._legend_texts = None
+        self._legend_src = None
 
-        # cache last arrays so spinbox changes re-apply without caller involvement
-        self._last_vis = (None, None, None)   # (lam_vis, spec_vis, vis_sat)
-        self._last_nir = (None, None, None)   # (lam_nir, spec_nir, nir_sat)
+        # inputs of the last full redraw (see _apply_wl_and_plot)
+        self._last_render_key = None
 
-        # persistent flags: has this channel ever had data?
-        self._has_vis_data = False
-        self._has_nir_data = False
+        # (source, float32 copy) of the VIS and NIR wavelength grids
+        self._lam32 = [(None, None), (None, None)]
 
         # initialize control visibility (nothing hidden up-front)
         self._set_wl_controls_visibility(False, False)
@@ -116,6 +255,7 @@ class SpectrumPlotWidget(QWidget):
 
     def _toggle_autoscale(self, checked):
         self.y_slider.setEnabled(not checked)
+        self._applied_ymax = None
         if checked:
             self.plot.enableAutoRange(axis=pg.ViewBox.YAxis)
         else:
@@ -124,79 +264,155 @@ class SpectrumPlotWidget(QWidget):
     # ---------- wavelength controls visibility ----------
     def _set_wl_controls_visibility(self, vis_present: bool, nir_present: bool):
         # Use persistent flags so spin changes never hide controls unexpectedly.
-        vis_show = self._has_vis_data
-        nir_show = self._has_nir_data
-        for w in (self.lbl_vis, self.vis_start, self.lbl_dash_vis, self.vis_stop):
-            w.setVisible(vis_show)
-        for w in (self.lbl_nir, self.nir_start, self.lbl_dash_nir, self.nir_stop):
-            w.setVisible(nir_show)
+        self.wl_bar.set_channels_visible(self._has_vis_data, self._has_nir_data)
 
     def _on_wl_changed(self, *_):
         # Ignore changes until any data has been drawn at least once
         if not (self._has_vis_data or self._has_nir_data):
             return
-        lam_vis, spec_vis, vis_sat = self._last_vis
-        lam_nir, spec_nir, nir_sat = self._last_nir
-        self._apply_wl_and_plot(lam_vis, spec_vis, vis_sat, lam_nir, spec_nir, nir_sat)
+        # (re)start the debounce window
+        self._replot_timer.start()
+
+    def _do_replot(self):
+        lam_vis, spec_vis, vis_label = self._last_vis
+        lam_nir, spec_nir, nir_label = self._last_nir
+        self._apply_wl_and_plot(lam_vis, spec_vis, vis_label, lam_nir, spec_nir, nir_label)
 
     # ---------- core redraw with windowing ----------
     def _apply_wl_and_plot(self,
-                           lam_vis, spec_vis, vis_sat,
-                           lam_nir, spec_nir, nir_sat):
+                           lam_vis, spec_vis, vis_label,
+                           lam_nir, spec_nir, nir_label):
+        # nothing to do if the same arrays would be drawn through the same windows
+        key = (id(lam_vis), id(spec_vis), self.vis_start.value(), self.vis_stop.value(), vis_label,
+               id(lam_nir), id(spec_nir), self.nir_start.value(), self.nir_stop.value(), nir_label)
+        if key == self._last_render_key:
+            return
+        self._last_render_key = key
+
         # VIS
         vis_present_now = lam_vis is not None and spec_vis is not None and len(lam_vis) > 0
         if vis_present_now:
-            s, e = self.vis_start.value(), self.vis_stop.value()
-            wl_v, yy_v = _slice_by_wavelength(lam_vis, spec_vis, s, e)
-            self.vis_curve.setData(wl_v, yy_v)
+            i0, i1 = _window_idx(lam_vis, self.vis_start.value(), self.vis_stop.value())
+            self._set_curve(0, self.vis_curve, lam_vis, spec_vis, i0, i1)
         else:
-            self.vis_curve.setData([], [])
+            self._set_curve(0, self.vis_curve)
 
         # NIR
         nir_present_now = lam_nir is not None and spec_nir is not None and len(lam_nir) > 0
         if nir_present_now:
-            s, e = self.nir_start.value(), self.nir_stop.value()
-            wl_n, yy_n = _slice_by_wavelength(lam_nir, spec_nir, s, e)
-            self.nir_curve.setData(wl_n, yy_n)
+            i0, i1 = _window_idx(lam_nir, self.nir_start.value(), self.nir_stop.value())
+            self._set_curve(1, self.nir_curve, lam_nir, spec_nir, i0, i1)
         else:
-            self.nir_curve.setData([], [])
+            self._set_curve(1, self.nir_curve)
 
         # Legend
-        self.legend.clear()
-        self.legend.addItem(self.vis_curve, f"VIS ({vis_sat:.1f}% sat)" if vis_sat is not None else "VIS")
-        self.legend.addItem(self.nir_curve, f"NIR ({nir_sat:.1f}% sat)" if nir_sat is not None else "NIR")
+        self._update_legend(vis_label, nir_label)
 
         # Keep control visibility in sync with "ever had data" state
         self._set_wl_controls_visibility(self._has_vis_data, self._has_nir_data)
 
         if self.autoscale_cb.isChecked():
-            self.plot.enableAutoRange(axis=pg.ViewBox.YAxis)
+            self._autoscale_y()
+
+    def _set_curve(self, idx, curve, lam=None, spec=None, i0=0, i1=0):
+        # same arrays through the same window: the curve already shows this
+        if _same_window(self._curve_src[idx], lam, spec, i0, i1):
+            return
+        self._curve_src[idx] = (lam, spec, i0, i1)
+        if lam is None:
+            curve.updateData(x=_EMPTY, y=_EMPTY)
+            self._win_ymax[idx] = 0.0
+            return
+        y = spec[i0:i1]
+        curve.updateData(x=lam[i0:i1], y=y)
+        # fmax ignores NaN, which loaded sample files may contain
+        self._win_ymax[idx] = float(np.fmax.reduce(y)) if len(y) else 0.0
+
+    def _autoscale_y(self):
+        # Y range from the drawn windows; skips ViewBox auto-range over every item
+        ymax = float(np.fmax(*self._win_ymax))
+        if not np.isfinite(ymax) or ymax <= 0.0:
+            return
+        last = self._applied_ymax
+        if last is not None and abs(ymax - last) <= 0.02 * last:
+            return  # hysteresis: avoid re-ranging on small fluctuations
+        self._applied_ymax = ymax
+        self.plot.setYRange(0, ymax * 1.05, padding=0)
+
+    def _update_legend(self, vis_label, nir_label):
+        # labels are preformatted by the producer (Spectrum.sat_label)
+        if (vis_label, nir_label) == self._legend_src:
+            return
+        self._legend_src = (vis_label, nir_label)
+        texts = (f"VIS ({vis_label})" if vis_label is not None else "VIS",
+                 f"NIR ({nir_label})" if nir_label is not None else "NIR")
+        if self._legend_labels is None:
+            # entries are created on first draw, then only relabelled
+            self.legend.addItem(self.vis_curve, texts[0])
+            self.legend.addItem(self.nir_curve, texts[1])
+            self._legend_labels = [label for _, label in self.legend.items[-2:]]
+        else:
+            for label, old, new in zip(self._legend_labels, self._legend_texts, texts):
+                if old != new:
+                    label.setText(new)
+        self._legend_texts = texts
 
     # ---------- public API ----------
+    def update_curve(self, kind, lam, spec, label=None, bounds=None):
+        """
+        Replace one channel's data and redraw only that curve; the other is left as is.
+        bounds: (min, max) wavelength of the full spectrum, for decimated `lam`.
+        """
+        lam = _f32_grid(self._lam32, 0 if kind is ChannelKind.VIS else 1, lam)
+        spec = _as_array(spec)
+        # the curves no longer match the last full redraw
+        self._last_render_key = None
+        present = lam is not None and spec is not None and len(lam) > 0
+        if kind is ChannelKind.VIS:
+            self._last_vis = (lam, spec, label)
+            self._has_vis_data = present or self._has_vis_data
+            idx, curve, start_sb, stop_sb = 0, self.vis_curve, self.vis_start, self.vis_stop
+        else:
+            self._last_nir = (lam, spec, label)
+            self._has_nir_data = present or self._has_nir_data
+            idx, curve, start_sb, stop_sb = 1, self.nir_curve, self.nir_start, self.nir_stop
+
+        if present:
+            self.wl_bar.clamp(idx, *(bounds or _lam_bounds(lam)))
+            i0, i1 = _window_idx(lam, start_sb.value(), stop_sb.value())
+            self._set_curve(idx, curve, lam, spec, i0, i1)
+        else:
+            self._set_curve(idx, curve)
+
+        self._update_legend(self._last_vis[2], self._last_nir[2])
+        self._set_wl_controls_visibility(self._has_vis_data, self._has_nir_data)
+
+        if self.autoscale_cb.isChecked():
+            self._autoscale_y()
+
     def plot_two(self,
-                 lam_vis=None, spec_vis=None, vis_sat=None,
-                 lam_nir=None, spec_nir=None, nir_sat=None):
+                 lam_vis=None, spec_vis=None, vis_label=None,
+                 lam_nir=None, spec_nir=None, nir_label=None):
+        # normalize once so spinbox replots reuse the same ndarrays
+        lam_vis, spec_vis = _f32_grid(self._lam32, 0, lam_vis), _as_array(spec_vis)
+        lam_nir, spec_nir = _f32_grid(self._lam32, 1, lam_nir), _as_array(spec_nir)
+
         # cache inputs
-        self._last_vis = (lam_vis, spec_vis, vis_sat)
-        self._last_nir = (lam_nir, spec_nir, nir_sat)
+        self._last_vis = (lam_vis, spec_vis, vis_label)
+        self._last_nir = (lam_nir, spec_nir, nir_label)
 
         # update "ever had data" flags
         self._has_vis_data = (lam_vis is not None and spec_vis is not None and len(lam_vis) > 0) or self._has_vis_data
         self._has_nir_data = (lam_nir is not None and spec_nir is not None and len(lam_nir) > 0) or self._has_nir_data
 
-        # optional: clamp spin ranges to actual data bounds once data is seen
-        try:
-            if lam_vis is not None and len(lam_vis) > 0:
-                self.vis_start.setMinimum(float(np.min(lam_vis)))
-                self.vis_stop.setMaximum(float(np.max(lam_vis)))
-            if lam_nir is not None and len(lam_nir) > 0:
-                self.nir_start.setMinimum(float(np.min(lam_nir)))
-                self.nir_stop.setMaximum(float(np.max(lam_nir)))
-        except Exception:
-            pass
+        # clamp spin ranges to actual data bounds once data is seen
+        if lam_vis is not None and len(lam_vis) > 0:
+            self.wl_bar.clamp(0, *_lam_bounds(lam_vis))
+        if lam_nir is not None and len(lam_nir) > 0:
+            self.wl_bar.clamp(1, *_lam_bounds(lam_nir))
 
         # draw with windowing
-        self._apply_wl_and_plot(lam_vis, spec_vis, vis_sat, lam_nir, spec_nir, nir_sat)
+        self._apply_wl_and_plot(lam_vis, spec_vis, vis_label, lam_nir, spec_nir, nir_label)
 
 
 # =============================================================================
@@ -206,69 +422,75 @@ class ReflectancePlotWidget(QWidget):
     """Reflectance plot for VIS and NIR with fixed lower bound, overlay, and compact wavelength windows."""
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.plot = pg.PlotWidget(title="Reflectance Spectrum")
+        # data stays a 0..1 fraction; the axis shows it as %
+        left_axis = PercentAxis(orientation='left')
+        left_axis.enableAutoSIPrefix(False)
+        self.plot = pg.PlotWidget(title="Reflectance Spectrum", axisItems={'left': left_axis})
         self.plot.setLabel('bottom', "Wavelength", units='nm')
         self.plot.setLabel('left', "Reflectance", units='%')
         self.plot.showGrid(x=True, y=True)
         self.legend = self.plot.addLegend()
-        self.plot.setYRange(-20, 140)
-
-        self.vis_curve = self.plot.plot([], [], pen=pg.mkPen('b', width=1))
-        self.nir_curve = self.plot.plot([], [], pen=pg.mkPen('r', width=1))
+        # pinned Y range top in % (view is -20 %..top); None while autoscaling
+        self._y_top = None
+        self._pin_y(140)
+
+        # bare line items; reflectance may hold NaN (zero reference), so the finite check stays on
+        self.vis_curve = pg.PlotCurveItem(pen=_PEN_VIS, antialias=False)
+        self.nir_curve = pg.PlotCurveItem(pen=_PEN_NIR, antialias=False)
+        # reuse the rasterized curve when only legend/overlay items repaint; setData invalidates it
+        for curve in (self.vis_curve, self.nir_curve):
+            curve.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        self.plot.addItem(self.vis_curve)
+        self.plot.addItem(self.nir_curve)
+        # labels never change, so the entries are added once here
+        self.legend.addItem(self.vis_curve, "VIS")
+        self.legend.addItem(self.nir_curve, "NIR")
 
         # --- Y-axis controls ---
-        y_controls = QHBoxLayout()
-        y_controls.addWidget(QLabel("Y-Max (%):"))
+        y_label = QLabel("Y-Max (%):")
         self.y_slider = QSlider(Qt.Horizontal)
         self.y_slider.setRange(0, 300)
         self.y_slider.setValue(140)
-        y_controls.addWidget(self.y_slider)
         self.autoscale_cb = QCheckBox("Autoscale Y-Axis")
-        y_controls.addWidget(self.autoscale_cb)
-        y_controls.addStretch()
-        self.y_slider.valueChanged.connect(self._update_range)
+        # ~30 Hz while dragging
+        self.y_slider.valueChanged.connect(_Throttled(self._update_range, 33, self))
         self.autoscale_cb.toggled.connect(self._toggle_autoscale)
 
-        # --- Compact one-row wavelength controls ---
-        self.wl_group = QGroupBox("Display range (nm)")
-        wl_layout = QHBoxLayout(self.wl_group)
-
-        def _box(val):
-            b = QDoubleSpinBox()
-            b.setRange(200, 2500)     # safe global bounds; later clamped to data
-            b.setDecimals(1)
-            b.setSingleStep(1.0)
-            b.setValue(val)
-            b.setMaximumWidth(80)
-            return b
-
-        self.lbl_vis = QLabel("VIS:")
-        self.vis_start = _box(400.0)
-        self.lbl_dash_vis = QLabel("–")
-        self.vis_stop  = _box(900.0)
-
-        self.lbl_nir = QLabel("NIR:")
-        self.nir_start = _box(900.0)
-        self.lbl_dash_nir = QLabel("–")
-        self.nir_stop  = _box(1700.0)
-
-        wl_layout.addWidget(self.lbl_vis);      wl_layout.addWidget(self.vis_start)
-        wl_layout.addWidget(self.lbl_dash_vis); wl_layout.addWidget(self.vis_stop)
-        wl_layout.addSpacing(15)
-        wl_layout.addWidget(self.lbl_nir);      wl_layout.addWidget(self.nir_start)
-        wl_layout.addWidget(self.lbl_dash_nir); wl_layout.addWidget(self.nir_stop)
-        wl_layout.addStretch()
-
-        for sb in (self.vis_start, self.vis_stop, self.nir_start, self.nir_stop):
-            sb.valueChanged.connect(self._on_wl_changed)
-
-        # --- main layout ---
-        lay = QVBoxLayout(self)
-        lay.addWidget(self.plot)
-        lay.addLayout(y_controls)
-        lay.addWidget(self.wl_group)
-
-        self._overlay_item = None
+        # --- Compact one-row wavelength controls (VIS and NIR) ---
+        self.wl_bar = WavelengthWindowBar()
+        self.vis_start, self.vis_stop, self.nir_start, self.nir_stop = self.wl_bar.spins
+        self.wl_bar.rangeChanged.connect(self._on_wl_changed)
+
+        # Coalesce bursts of spinbox changes into one replot
+        self._replot_timer = QTimer(self)
+        self._replot_timer.setSingleShot(True)
+        self._replot_timer.setInterval(40)
+        self._replot_timer.timeout.connect(self._do_replot)
+
+        # --- main layout: one grid (plot / Y controls / wavelength bar) ---
+        grid = QGridLayout(self)
+        grid.addWidget(self.plot, 0, 0, 1, 4)
+        grid.addWidget(y_label, 1, 0)
+        grid.addWidget(self.y_slider, 1, 1)
+        grid.addWidget(self.autoscale_cb, 1, 2)
+        grid.addWidget(self.wl_bar, 2, 0, 1, 4)
+        grid.setRowStretch(0, 1)
+        grid.setColumnStretch(1, 1)  # slider and trailing space share the width
+        grid.setColumnStretch(3, 1)
+
+        self._overlay_item = pg.TextItem(anchor=(0.5, 0.5))
+        self._overlay_item.hide()
+        self._overlay_text = None
+        self.plot.addItem(self._overlay_item, ignoreBounds=True)
+
+        # view centre, kept current by the ViewBox instead of polled per overlay
+        self._vb = self.plot.getViewBox()
+        (x0, x1), (y0, y1) = self._vb.viewRange()
+        self._view_mid = (0.5 * (x0 + x1), 0.5 * (y0 + y1))
+        self._vb.sigRangeChanged.connect(self._on_view_range)
+
+        # (lam, refl, i0, i1) currently shown by each curve (VIS, NIR)
+        self._curve_src = [None, None]
 
         # caches & flags
         self._last_vis = (None, None)  # (lam_vis, refl_vis)
@@ -276,116 +498,131 @@ class ReflectancePlotWidget(QWidget):
         self._has_vis_data = False
         self._has_nir_data = False
 
+        # inputs of the last full redraw (see _apply_wl_and_plot)
+        self._last_render_key = None
+
+        # (source, float32 copy) of the VIS and NIR wavelength grids
+        self._lam32 = [(None, None), (None, None)]
+
         # initialize control visibility
         self._set_wl_controls_visibility(False, False)
 
     # ---------- Y-axis handlers ----------
     def _update_range(self, v):
         if not self.autoscale_cb.isChecked():
-            self.plot.setYRange(-20, v)
+            self._pin_y(v)
 
     def _toggle_autoscale(self, checked):
         self.y_slider.setEnabled(not checked)
+        self._y_top = None
         if checked:
             self.plot.enableAutoRange(axis=pg.ViewBox.YAxis)
         else:
-            self.plot.setYRange(-20, self.y_slider.value())
+            self._pin_y(self.y_slider.value())
+
+    def _pin_y(self, top):
+        # `top` is in % (slider units); setYRange also turns Y auto-range off,
+        # so skip it when already pinned there
+        if top != self._y_top:
+            self.plot.setYRange(-0.2, top / 100.0)
+            self._y_top = top
 
     # ---------- overlay helpers ----------
     def _show_overlay(self, text: str):
-        if self._overlay_item is not None:
-            try:
-                self.plot.removeItem(self._overlay_item)
-            except Exception:
-                pass
-            self._overlay_item = None
+        # one persistent item: re-layout the HTML only when the text changes
+        if text != self._overlay_text:
+            self._overlay_item.setHtml(_OVERLAY_HTML.format(text=text))
+            self._overlay_text = text
 
-        vb = self.plot.getViewBox()
-        (x0, x1), (y0, y1) = vb.viewRange()
-        x_mid = 0.5 * (x0 + x1)
-        y_mid = 0.5 * (y0 + y1)
-
-        txt = pg.TextItem(anchor=(0.5, 0.5))
-        html = (
-            '<div style="background-color: rgba(255,255,255,220); '
-            'color: black; padding: 6px; border: 1px solid black; border-radius: 4px;">'
-            f'{text}'
-            '</div>'
-        )
-        txt.setHtml(html)
-        txt.setPos(x_mid, y_mid)
-        self.plot.addItem(txt)
-        self._overlay_item = txt
+        self._overlay_item.setPos(*self._view_mid)
+        self._overlay_item.show()
+
+    def _on_view_range(self, vb, ranges, *_):
+        (x0, x1), (y0, y1) = ranges
+        self._view_mid = (0.5 * (x0 + x1), 0.5 * (y0 + y1))
+        if self._overlay_item.isVisible():
+            self._overlay_item.setPos(*self._view_mid)  # stay centred while panning/zooming
 
     def clear_overlay(self):
-        if self._overlay_item is not None:
-            try:
-                self.plot.removeItem(self._overlay_item)
-            except Exception:
-                pass
-            self._overlay_item = None
+        self._overlay_item.hide()
 
     # ---------- wavelength controls visibility ----------
     def _set_wl_controls_visibility(self, vis_present: bool, nir_present: bool):
         # Use persistent flags so spin changes never hide controls unexpectedly.
-        vis_show = self._has_vis_data
-        nir_show = self._has_nir_data
-        for w in (self.lbl_vis, self.vis_start, self.lbl_dash_vis, self.vis_stop):
-            w.setVisible(vis_show)
-        for w in (self.lbl_nir, self.nir_start, self.lbl_dash_nir, self.nir_stop):
-            w.setVisible(nir_show)
+        self.wl_bar.set_channels_visible(self._has_vis_data, self._has_nir_data)
 
     def _on_wl_changed(self, *_):
         # Ignore changes until any data has been drawn at least once
         if not (self._has_vis_data or self._has_nir_data):
             return
+        # (re)start the debounce window
+        self._replot_timer.start()
+
+    def _do_replot(self):
         lam_vis, refl_vis = self._last_vis
         lam_nir, refl_nir = self._last_nir
         self._apply_wl_and_plot(lam_vis, refl_vis, lam_nir, refl_nir)
 
+    def _set_curve(self, idx, curve, lam=None, refl=None, i0=0, i1=0):
+        # same arrays through the same window: the curve already shows this
+        if _same_window(self._curve_src[idx], lam, refl, i0, i1):
+            return
+        self._curve_src[idx] = (lam, refl, i0, i1)
+        if lam is None:
+            curve.updateData(x=_EMPTY, y=_EMPTY)
+            return
+        curve.updateData(x=lam[i0:i1], y=refl[i0:i1])
+
     # ---------- core redraw with windowing ----------
     def _apply_wl_and_plot(self, lam_vis, refl_vis, lam_nir, refl_nir):
+        # nothing to do if the same arrays would be drawn through the same windows
+        key = (id(lam_vis), id(refl_vis), self.vis_start.value(), self.vis_stop.value(),
+               id(lam_nir), id(refl_nir), self.nir_start.value(), self.nir_stop.value())
+        if key == self._last_render_key:
+            return
+        self._last_render_key = key
+
         self.clear_overlay()
 
         vis_present_now = lam_vis is not None and refl_vis is not None and len(lam_vis) > 0
         nir_present_now = lam_nir is not None and refl_nir is not None and len(lam_nir) > 0
 
         if not vis_present_now and not nir_present_now:
-            self.vis_curve.setData([], [])
-            self.nir_curve.setData([], [])
+            self._set_curve(0, self.vis_curve)
+            self._set_curve(1, self.nir_curve)
             self._show_overlay("No Sample or Calibration Data Available")
             # keep controls visible based on ever-seen flags
             self._set_wl_controls_visibility(self._has_vis_data, self._has_nir_data)
             return
 
         if vis_present_now:
-            s, e = self.vis_start.value(), self.vis_stop.value()
-            wl_v, rr_v = _slice_by_wavelength(lam_vis, refl_vis, s, e)
-            self.vis_curve.setData(wl_v, 100.0 * rr_v)
+            i0, i1 = _window_idx(lam_vis, self.vis_start.value(), self.vis_stop.value())
+            self._set_curve(0, self.vis_curve, lam_vis, refl_vis, i0, i1)
         else:
-            self.vis_curve.setData([], [])
+            self._set_curve(0, self.vis_curve)
 
         if nir_present_now:
-            s, e = self.nir_start.value(), self.nir_stop.value()
-            wl_n, rr_n = _slice_by_wavelength(lam_nir, refl_nir, s, e)
-            self.nir_curve.setData(wl_n, 100.0 * rr_n)
+            i0, i1 = _window_idx(lam_nir, self.nir_start.value(), self.nir_stop.value())
+            self._set_curve(1, self.nir_curve, lam_nir, refl_nir, i0, i1)
         else:
-            self.nir_curve.setData([], [])
-
-        self.legend.clear()
-        self.legend.addItem(self.vis_curve, "VIS")
-        self.legend.addItem(self.nir_curve, "NIR")
+            self._set_curve(1, self.nir_curve)
 
         # Keep control visibility in sync with ever-seen state
         self._set_wl_controls_visibility(self._has_vis_data, self._has_nir_data)
 
         if self.autoscale_cb.isChecked():
-            self.plot.enableAutoRange(axis=pg.ViewBox.YAxis)
+            # once enabled, pyqtgraph re-ranges on data changes by itself
+            if not self.plot.getViewBox().autoRangeEnabled()[1]:
+                self.plot.enableAutoRange(axis=pg.ViewBox.YAxis)
         else:
-            self.plot.setYRange(-20, self.y_slider.value())
+            self._pin_y(self.y_slider.value())
 
     # ---------- public API ----------
     def plot_two(self, lam_vis=None, refl_vis=None, lam_nir=None, refl_nir=None):
+        # normalize once so spinbox replots reuse the same ndarrays
+        lam_vis, refl_vis = _f32_grid(self._lam32, 0, lam_vis), _as_array(refl_vis)
+        lam_nir, refl_nir = _f32_grid(self._lam32, 1, lam_nir), _as_array(refl_nir)
+
         # cache inputs
         self._last_vis = (lam_vis, refl_vis)
         self._last_nir = (lam_nir, refl_nir)
@@ -394,16 +631,11 @@ class ReflectancePlotWidget(QWidget):
         self._has_vis_data = (lam_vis is not None and refl_vis is not None and len(lam_vis) > 0) or self._has_vis_data
         self._has_nir_data = (lam_nir is not None and refl_nir is not None and len(lam_nir) > 0) or self._has_nir_data
 
-        # optional: clamp spin ranges to actual data bounds once data is seen
-        try:
-            if lam_vis is not None and len(lam_vis) > 0:
-                self.vis_start.setMinimum(float(np.min(lam_vis)))
-                self.vis_stop.setMaximum(float(np.max(lam_vis)))
-            if lam_nir is not None and len(lam_nir) > 0:
-                self.nir_start.setMinimum(float(np.min(lam_nir)))
-                self.nir_stop.setMaximum(float(np.max(lam_nir)))
-        except Exception:
-            pass
+        # clamp spin ranges to actual data bounds once data is seen
+        if lam_vis is not None and len(lam_vis) > 0:
+            self.wl_bar.clamp(0, *_lam_bounds(lam_vis))
+        if lam_nir is not None and len(lam_nir) > 0:
+            self.wl_bar.clamp(1, *_lam_bounds(lam_nir))
 
         # draw with windowing
         self._apply_wl_and_plot(lam_vis, refl_vis, lam_nir, refl_nir)